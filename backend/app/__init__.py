@@ -1,45 +1,155 @@
 from __future__ import annotations
 
 import os
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
 
+import sqlalchemy as sa
 from flask import Flask
+from sqlalchemy import inspect
 from werkzeug.middleware.proxy_fix import ProxyFix
 
-from .config import Config
+from .config import Config, _truthy, default_settings, env_config
 from .extensions import db, migrate, login_manager
+from .json_provider import init_json
 from .models import User, Setting, BioEvent
 from .services.logging_service import configure_logging
-from .services.scheduler import init_scheduler
 
-def _ensure_default_settings_app(app: Flask) -> None:
-    from os import getenv
-    env_settings = {
-        'STREAM_FPS': getenv('STREAM_FPS'),
-        'STREAM_RES': getenv('STREAM_RES'),
-        'VIDEO_SOURCE': getenv('VIDEO_SOURCE'),
-        'AUDIO_SOURCE': getenv('AUDIO_SOURCE'),
-    }
-    for k, v in app.config.get("DEFAULT_SETTINGS", {}).items():
-        app.config[k] = env_settings.get(k)
+_BACKEND_DIR = Path(__file__).resolve().parent.parent
+_DEFAULT_MEDIA_ROOT = str(_BACKEND_DIR / "data")
+
+# Seconds between CPU usage samples taken by the background monitor.
+CPU_POLL_INTERVAL = 2.0
+
+_cpu_monitor_stop = threading.Event()
+_cpu_monitor_thread: threading.Thread | None = None
+_process_stats_lock = threading.Lock()
+_process_stats: dict = {}
+_autostart_lock_fd: int | None = None
+# Only one worker samples system-wide CPU; it publishes the value as a
+# float64 in a small mmap'd file that the other workers read.
+_cpu_shared_buf = None
+_cpu_sampler_fd: int | None = None
+_system_cpu_percent: float | None = None
+# Set at the end of create_app(); background startup tasks wait on it.
+_app_ready = threading.Event()
+
+
+def get_process_stats() -> dict:
+    """Latest stats for this worker and its children, as sampled by the CPU monitor."""
+    with _process_stats_lock:
+        return dict(_process_stats)
+
+
+def get_system_cpu_percent() -> float:
+    """System-wide CPU percentage published by the sampling worker.
+
+    Falls back to a local non-blocking psutil reading when no worker has
+    published a value yet.
+    """
+    global _cpu_shared_buf
+    if _system_cpu_percent is not None:
+        # This worker is the sampler
+        return _system_cpu_percent
+    if _cpu_shared_buf is None:
+        _cpu_shared_buf = _open_cpu_shared_buf()
+    if _cpu_shared_buf is not None:
+        import struct
+
+        (value,) = struct.unpack_from("d", _cpu_shared_buf, 0)
+        if value == value:  # NaN until the sampler has written a value
+            return value
+
+    import psutil
+
+    return psutil.cpu_percent(interval=0)
+
+
+def _cpu_shared_file() -> Path:
+    import tempfile
+
+    return Path(tempfile.gettempdir()) / f"birdshome-cpu-{os.getuid()}.bin"
+
+
+def _open_cpu_shared_buf():
+    """Map the shared CPU value read-only, or None if no sampler created it yet."""
+    import mmap
+
+    try:
+        fd = os.open(_cpu_shared_file(), os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        if os.fstat(fd).st_size < 8:
+            return None
+        return mmap.mmap(fd, 8, prot=mmap.PROT_READ)
+    except (OSError, ValueError):
+        return None
+    finally:
+        # The mapping stays valid after the fd is closed.
+        os.close(fd)
+
+
+def _claim_cpu_sampler():
+    """Try to become the worker that samples system CPU.
+
+    Returns a writable mapping of the shared value if this process got the
+    flock lock, else None. The lock (and fd) is held for the life of the
+    worker, so another worker takes over once it exits. flock rather than
+    lockf: a lockf lock is dropped as soon as the process closes any fd on
+    the file, e.g. the read-only one in _open_cpu_shared_buf().
+    """
+    import fcntl
+    import mmap
+    import struct
+
+    global _cpu_sampler_fd
+    try:
+        fd = os.open(_cpu_shared_file(), os.O_CREAT | os.O_RDWR, 0o644)
+    except OSError:
+        return None
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return None
+
+    try:
+        os.ftruncate(fd, 8)
+        buf = mmap.mmap(fd, 8)
+    except (OSError, ValueError):
+        # Closing the fd also releases the lock for the next worker.
+        os.close(fd)
+        return None
+    struct.pack_into("d", buf, 0, float("nan"))
+    _cpu_sampler_fd = fd
+    return buf
 
 
 def create_app() -> Flask:
     app = Flask(__name__, static_folder="static")
     app.config.from_object(Config)
-    _ensure_default_settings_app(app)
     # Trust X-Forwarded-* headers from the local reverse proxy (nginx).
-    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1, x_port=1)
+    if not isinstance(app.wsgi_app, ProxyFix):
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1, x_port=1)
 
-    # Convenience: expose default settings and allow runtime overrides.
-    app.config.update(Config.DEFAULT_SETTINGS)
-    app.config["DEFAULT_SETTINGS"] = Config.DEFAULT_SETTINGS
+    init_json(app)
+
+    # Effective values are loaded into app.config by _ensure_default_settings().
+    app.config["DEFAULT_SETTINGS"] = default_settings()
 
     # Set MEDIA_ROOT to an absolute path (defaults to backend/data in development, can be overridden)
-    media_root = os.getenv("MEDIA_ROOT", "data")
-    if not os.path.isabs(media_root):
-        # Make relative paths absolute (relative to backend directory)
-        media_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", media_root))
-    app.config["MEDIA_ROOT"] = media_root
+    media_root = os.getenv("MEDIA_ROOT")
+    if media_root:
+        # Relative paths are relative to the backend directory
+        if not os.path.isabs(media_root):
+            media_root = os.path.normpath(_BACKEND_DIR / media_root)
+    app.config["MEDIA_ROOT"] = media_root or _DEFAULT_MEDIA_ROOT
+    # Symlinks resolved once; request handlers compare against this path
+    app.config["MEDIA_ROOT_RESOLVED"] = Path(app.config["MEDIA_ROOT"]).resolve()
+    app.config["USE_X_ACCEL"] = _truthy(app.config.get("USE_X_ACCEL", "0"))
 
     # Logging
     configure_logging(app)
@@ -55,20 +165,20 @@ def create_app() -> Flask:
     app.register_blueprint(main)
     app.register_blueprint(api)
 
-    with app.app_context():
-        # Create tables if migrations haven't been run yet (dev convenience).
-        db.create_all()
-        _bootstrap_admin(app)
+    with app.app_context(), _bootstrap_lock() as is_owner:
+        # Workers that waited for another one to bootstrap only load settings.
+        if is_owner:
+            # Create tables if migrations haven't been run yet (dev convenience).
+            if not _schema_managed():
+                db.create_all()
+            _bootstrap_admin(app)
         _ensure_default_settings(app)
-        _seed_bio_events()
+        if is_owner:
+            _seed_bio_events()
 
     # Scheduler (optional; recommended to run in birdshome-jobs.service)
-    try:
-        enabled = str(app.config.get("SCHEDULER_ENABLED", "1")).lower() in ("1","true","yes","on")
-    except Exception:
-        enabled = True
-    if enabled:
-        init_scheduler(app)
+    if _truthy(app.config.get("SCHEDULER_ENABLED", "1")):
+        _init_scheduler_async(app)
     else:
         app.logger.info("Scheduler disabled (SCHEDULER_ENABLED=0)")
 
@@ -76,30 +186,74 @@ def create_app() -> Flask:
     _start_cpu_monitor()
 
     # Autostart stream if enabled
-    try:
-        autostart = str(app.config.get("STREAM_AUTOSTART", "1")).lower() in ("1","true","yes","on")
-    except Exception:
-        autostart = False
-    if autostart:
+    if _truthy(app.config.get("STREAM_AUTOSTART", "1")):
         _autostart_stream(app)
 
+    _app_ready.set()
     return app
 
 
-@login_manager.user_loader
+@contextmanager
+def _bootstrap_lock():
+    """Serialize startup bootstrap across gunicorn workers.
 
+    Yields True if this process got the lock right away and should run the
+    bootstrap. Workers that had to wait for another one yield False and can
+    skip the write-side of the bootstrap.
+    """
+    import fcntl
+    import tempfile
+
+    lock_file = Path(tempfile.gettempdir()) / f"birdshome-bootstrap-{os.getuid()}.lock"
+    try:
+        fd = os.open(lock_file, os.O_CREAT | os.O_WRONLY, 0o644)
+    except OSError:
+        # Cannot coordinate with other workers; bootstrapping is idempotent anyway.
+        yield True
+        return
+
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            is_owner = True
+        except BlockingIOError:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            is_owner = False
+        yield is_owner
+    finally:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+
+def _schema_managed() -> bool:
+    """True if the schema is managed by migrations (or create_all is disabled)."""
+    if _truthy(env_config().SKIP_CREATE_ALL or "0"):
+        return True
+    return inspect(db.engine).has_table("alembic_version")
+
+
+@login_manager.user_loader
 def load_user(user_id: str):
     try:
         uid = int(user_id)
     except ValueError:
         return None
-    return User.query.get(uid)
+    # Session.get() checks the identity map before querying.
+    return db.session.get(User, uid)
 
 
-def _bootstrap_admin(app: Flask) -> None:
-    """Ensure an admin user exists (username from config, password managed via an installation script)."""
+@lru_cache(maxsize=1)
+def _temporary_admin_hash() -> str:
+    """bcrypt hash of the temporary admin password, computed at most once per process."""
     from .security import hash_password
 
+    return hash_password("change-me-now")
+
+
+def _bootstrap_admin(app: Flask) -> None:
+    """Ensure an admin user exists (username from config, password managed via an installation script)."""
     username = app.config.get("ADMIN_USERNAME")
 
     if not username:
@@ -122,130 +276,195 @@ def _bootstrap_admin(app: Flask) -> None:
         return
 
     # Create new admin user with temporary password (will be overwritten by an installation script)
-    user = User(username=username, password_hash=hash_password("change-me-now"), is_admin=True)
+    user = User(username=username, password_hash=_temporary_admin_hash(), is_admin=True)
     db.session.add(user)
     db.session.commit()
 
 
 def _ensure_default_settings(app: Flask) -> None:
-    for k, v in app.config.get("DEFAULT_SETTINGS", {}).items():
-        row = Setting.query.filter_by(key=k).first()
-        if not row:
-            db.session.add(Setting(key=k, value=str(v)))
-        # Always keep effective config updated.
-        app.config[k] = row.value if row else str(v)
-    db.session.commit()
+    """Insert missing settings rows and load the effective values into app.config.
+
+    Environment overrides are already folded into the defaults (see
+    config.default_settings()), so this is the only pass over them.
+    """
+    defaults = app.config.get("DEFAULT_SETTINGS", {})
+    # One query for all keys, returning plain tuples (no ORM instances).
+    existing = dict(db.session.execute(
+        sa.select(Setting.key, Setting.value).where(Setting.key.in_(list(defaults)))
+    ).all())
+    to_add = [Setting(key=k, value=str(v)) for k, v in defaults.items() if k not in existing]
+    if to_add:
+        db.session.bulk_save_objects(to_add)
+        db.session.commit()
+    # Always keep effective config updated.
+    for k, v in defaults.items():
+        app.config[k] = existing.get(k, str(v))
 
 
 def _seed_bio_events() -> None:
-    # Only seed if empty.
-    if BioEvent.query.count() > 0:
-        return
+    """Insert demo bio events if the table is empty.
+
+    Done as a single INSERT ... SELECT ... WHERE NOT EXISTS statement so the
+    emptiness check and the insert share one round-trip.
+    """
     from datetime import date
 
     demo = [
-        BioEvent(kind="arrival", event_date=date(2024, 3, 5), notes="Pair of blue tits arrived."),
-        BioEvent(kind="egg", event_date=date(2024, 3, 15), notes="First egg laid."),
-        BioEvent(kind="hatch", event_date=date(2024, 3, 29), notes="First chick hatched."),
+        ("arrival", date(2024, 3, 5), "Pair of blue tits arrived."),
+        ("egg", date(2024, 3, 15), "First egg laid."),
+        ("hatch", date(2024, 3, 29), "First chick hatched."),
     ]
-    db.session.add_all(demo)
+    table_empty = ~sa.exists().select_from(BioEvent)
+    rows = sa.union_all(*(
+        sa.select(sa.literal(kind), sa.literal(event_date, db.Date), sa.literal(notes)).where(table_empty)
+        for kind, event_date, notes in demo
+    ))
+    db.session.execute(sa.insert(BioEvent).from_select(["kind", "event_date", "notes"], rows))
     db.session.commit()
 
 
+def _init_scheduler_async(app: Flask) -> None:
+    """Import and start APScheduler off the startup path so create_app returns quickly."""
+
+    def _init():
+        try:
+            from .services.scheduler import init_scheduler
+
+            init_scheduler(app)
+        except Exception as e:
+            app.logger.error(f"Failed to start scheduler: {e}")
+
+    timer = threading.Timer(0, _init)
+    timer.daemon = True
+    timer.name = "scheduler-init"
+    timer.start()
+
+
 def _start_cpu_monitor() -> None:
     """Start background thread to keep CPU percentage cache updated."""
-    import threading
-    import time
+    import atexit
     import psutil
 
+    global _cpu_monitor_thread
+    if _cpu_monitor_thread is not None and _cpu_monitor_thread.is_alive():
+        return
+
+    proc = psutil.Process()
+
+    def _sample_process() -> dict:
+        # oneshot() batches the /proc reads behind cpu_percent/memory_info.
+        with proc.oneshot():
+            cpu = proc.cpu_percent()
+            rss = proc.memory_info().rss
+            children = proc.children()
+
+        children_rss = 0
+        for child in children:
+            try:
+                with child.oneshot():
+                    children_rss += child.memory_info().rss
+            except psutil.Error:
+                continue
+
+        return {
+            "cpu_percent": cpu,
+            "rss_bytes": rss,
+            "children": len(children),
+            "children_rss_bytes": children_rss,
+        }
+
     def _monitor_cpu():
-        """Background thread that updates CPU percentage every 2 seconds."""
-        while True:
+        """Background thread that updates CPU/process stats every CPU_POLL_INTERVAL seconds."""
+        import struct
+
+        global _process_stats, _system_cpu_percent
+        shared = _claim_cpu_sampler()
+        # Prime psutil: the first non-blocking call only sets the baseline.
+        psutil.cpu_percent(interval=None)
+        proc.cpu_percent()
+        while not _cpu_monitor_stop.wait(CPU_POLL_INTERVAL):
             try:
-                # This call updates the internal cache that cpu_percent(interval=0) uses
-                psutil.cpu_percent(interval=1)
-                time.sleep(1)
+                if shared is None:
+                    # Take over if the sampling worker went away.
+                    shared = _claim_cpu_sampler()
+                    if shared is not None:
+                        psutil.cpu_percent(interval=None)
+                        continue
+                else:
+                    _system_cpu_percent = psutil.cpu_percent(interval=None)
+                    struct.pack_into("d", shared, 0, _system_cpu_percent)
+                stats = _sample_process()
+                with _process_stats_lock:
+                    _process_stats = stats
             except Exception:
-                time.sleep(5)
+                _cpu_monitor_stop.wait(5)
 
-    thread = threading.Thread(target=_monitor_cpu, daemon=True, name="cpu-monitor")
-    thread.start()
+    _cpu_monitor_stop.clear()
+    _cpu_monitor_thread = threading.Thread(target=_monitor_cpu, daemon=True, name="cpu-monitor")
+    _cpu_monitor_thread.start()
+    atexit.register(_cpu_monitor_stop.set)
 
 
 def _autostart_stream(app: Flask) -> None:
     """Autostart stream service in background thread after app initialization.
 
-    Uses a lock file to ensure only one worker starts the stream.
+    Uses a POSIX record lock (lockf) on a pid file to ensure only one worker
+    starts the stream. The lock is held for the lifetime of that worker and
+    released by the kernel when it exits, so there are no stale lock files.
     """
-    import threading
-    import time
-    from pathlib import Path
     import fcntl
+    import tempfile
 
     def _start_stream():
-        # Wait for app to be fully initialized
-        time.sleep(3)
+        global _autostart_lock_fd
+
+        # Wait for create_app() to finish (bounded in case it failed midway)
+        if not _app_ready.wait(timeout=10):
+            app.logger.warning("App initialization did not finish within 10s, autostarting anyway")
 
         # Use user-specific lock file to avoid permission issues
-        import os
-        import tempfile
-        lock_dir = Path(tempfile.gettempdir())
-        lock_file = lock_dir / f"birdshome-stream-autostart-{os.getuid()}.lock"
+        lock_file = Path(tempfile.gettempdir()) / f"birdshome-stream-autostart-{os.getuid()}.lock"
 
-        fd = None
         try:
-            # Remove stale lock file if it exists
-            if lock_file.exists():
-                try:
-                    # Check if the lock file is stale (older than 60 seconds)
-                    import time as time_module
-                    if time_module.time() - lock_file.stat().st_mtime > 60:
-                        lock_file.unlink()
-                        app.logger.info(f"Removed stale lock file {lock_file}")
-                except (PermissionError, OSError) as e:
-                    app.logger.warning(f"Cannot access lock file {lock_file}: {e}")
-                    # Continue anyway - we'll try to create our own
-
-            # Try to acquire exclusive lock with proper permissions
-            fd = os.open(lock_file, os.O_CREAT | os.O_WRONLY | os.O_EXCL, 0o644)
-            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            fd = os.open(lock_file, os.O_CREAT | os.O_RDWR, 0o644)
+        except OSError as e:
+            app.logger.error(f"Cannot open autostart lock file {lock_file}: {e}")
+            return
 
-            # We got the lock, start the stream
+        try:
+            fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            # Another worker holds the lock (errno EACCES or EAGAIN depending on platform)
             try:
-                with app.app_context():
-                    from .services.stream_service import stream_service
-
-                    # Check if already running
-                    if stream_service.is_running():
-                        app.logger.info("Stream already running, skipping autostart")
-                        return
-
-                    app.logger.info("Autostarting stream service...")
-                    status = stream_service.start()
-                    if status.running:
-                        app.logger.info(f"Stream autostarted successfully (mode: {status.mode}, PID: {status.pid})")
-                    else:
-                        app.logger.warning("Stream autostart failed - service not running")
-            except Exception as e:
-                app.logger.error(f"Failed to autostart stream: {e}")
-
-        except FileExistsError:
-            # Another worker is already starting the stream
-            app.logger.info("Another worker is starting the stream, skipping autostart")
-        except BlockingIOError:
-            # Another worker is already starting the stream
-            app.logger.info("Lock already held by another process, skipping autostart")
+                holder = os.pread(fd, 32, 0).decode().strip()
+            except (OSError, UnicodeDecodeError):
+                holder = "?"
+            os.close(fd)
+            app.logger.info(f"Stream autostart handled by worker {holder or '?'}, skipping")
+            return
+
+        # We own the lock: record our pid and keep the fd open while this worker lives.
+        os.ftruncate(fd, 0)
+        os.pwrite(fd, str(os.getpid()).encode(), 0)
+        _autostart_lock_fd = fd
+
+        try:
+            with app.app_context():
+                from .services.stream_service import stream_service
+
+                # Check if already running
+                if stream_service.is_running():
+                    app.logger.info("Stream already running, skipping autostart")
+                    return
+
+                app.logger.info("Autostarting stream service...")
+                status = stream_service.start()
+                if status.running:
+                    app.logger.info(f"Stream autostarted successfully (mode: {status.mode}, PID: {status.pid})")
+                else:
+                    app.logger.warning("Stream autostart failed - service not running")
         except Exception as e:
-            app.logger.error(f"Error in stream autostart lock handling: {e}")
-        finally:
-            # Cleanup
-            if fd is not None:
-                try:
-                    fcntl.flock(fd, fcntl.LOCK_UN)
-                    os.close(fd)
-                    lock_file.unlink(missing_ok=True)
-                except Exception:
-                    pass
+            app.logger.error(f"Failed to autostart stream: {e}")
 
     thread = threading.Thread(target=_start_stream, daemon=True, name="stream-autostart")
     thread.start()
@@ -1,70 +1,121 @@
 import os
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping
 
 from dotenv import load_dotenv
 
 from . import constants as C
 
-load_dotenv()
+_TRUTHY = frozenset({"1", "true", "yes", "on", "y", "t"})
 
 
-def _env(key: str, default: str | None = None) -> str | None:
-    return os.getenv(key, default)
-
-
-class Config:
-    # Flask
-    SECRET_KEY = _env("SECRET_KEY", "change-me")
-    SQLALCHEMY_DATABASE_URI = _env("DATABASE_URL", "sqlite:///birdshome.db")
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
-
-    SESSION_COOKIE_NAME = C.SESSION_COOKIE_NAME
-    SESSION_COOKIE_HTTPONLY = True
-    SESSION_COOKIE_SAMESITE = "Lax"
-    SESSION_COOKIE_SECURE = True
-
-    REMEMBER_COOKIE_HTTPONLY = True
-    REMEMBER_COOKIE_SAMESITE = "Lax"
-    SESSION_COOKIE_SECURE = os.getenv("TLS_MODE", "letsencrypt") != "none"
-    REMEMBER_COOKIE_SECURE = SESSION_COOKIE_SECURE
+def _truthy(value) -> bool:
+    """Parse a config/env flag such as "1", "true" or "on"."""
+    return str(value).strip().lower() in _TRUTHY
 
-    PREFERRED_URL_SCHEME = "https"
 
-    # CSRF
-    CSRF_COOKIE_NAME = C.CSRF_COOKIE_NAME
+@dataclass(frozen=True)
+class EnvConfig:
+    """Snapshot of the environment variables read by the app (None = unset)."""
 
-    # Streaming / ffmpeg
-    FFMPEG_BIN = _env("FFMPEG_BIN", "ffmpeg")
-    VIDEO_SOURCE = _env("VIDEO_SOURCE")
-    AUDIO_SOURCE = _env("AUDIO_SOURCE", "-f alsa -i plughw:3,0")
+    # Flask / security
+    FLASK_ENV: str | None = None
+    SECRET_KEY: str | None = None
+    DATABASE_URL: str | None = None
+    TLS_MODE: str | None = None
+    ADMIN_USERNAME: str | None = None
+    INTERNAL_TOKEN: str | None = None
+    SCHEDULER_ENABLED: str | None = None
+    FFMPEG_BIN: str | None = None
+    USE_X_ACCEL: str | None = None
+    HEALTHCHECK_CACHE_TTL: str | None = None
+    VERIFY_WITH_FFPROBE: str | None = None
+    SKIP_CREATE_ALL: str | None = None
 
-    # Bootstrap admin (password is managed in database, not in .env)
-    ADMIN_USERNAME = _env("ADMIN_USERNAME", "admin")
-
-    # Internal control token (used by local system services to call internal endpoints)
-    INTERNAL_TOKEN = _env("INTERNAL_TOKEN", "change-me")
+    # Logging
+    LOG_DIR: str | None = None
+    LOG_FILE: str | None = None
+    LOG_MAX_BYTES: str | None = None
+    LOG_BACKUP_COUNT: str | None = None
+    LOG_ENABLED: str | None = None
+    LOG_LEVEL: str | None = None
+
+    # Settings keys (see constants.py)
+    STREAM_MODE: str | None = None
+    STREAM_RES: str | None = None
+    STREAM_FPS: str | None = None
+    RECORD_RES: str | None = None
+    RECORD_FPS: str | None = None
+    VIDEO_ROTATION: str | None = None
+    VIDEO_ENCODER: str | None = None
+    VIDEO_SOURCE: str | None = None
+    AUDIO_SOURCE: str | None = None
+    STREAM_UDP_URL: str | None = None
+    MOTION_SOURCE: str | None = None
+    HLS_SEGMENT_SECONDS: str | None = None
+    HLS_PLAYLIST_SIZE: str | None = None
+    PREFIX: str | None = None
+    PHOTO_INTERVAL_S: str | None = None
+    TIMELAPSE_FPS: str | None = None
+    TIMELAPSE_DAYS: str | None = None
+    UPLOAD_INTERVAL_MIN: str | None = None
+    RETENTION_DAYS: str | None = None
+    YOLO_MODEL_PATH: str | None = None
+    YOLO_THRESH: str | None = None
+    IR_GPIO: str | None = None
+    LUX_GPIO: str | None = None
+    LUX_THRESHOLD: str | None = None
+    MOTION_ENABLED: str | None = None
+    MOTION_THRESHOLD: str | None = None
+    MOTION_DURATION_S: str | None = None
+    MOTION_COOLDOWN_S: str | None = None
+    MOTION_SENSOR_GPIO: str | None = None
+    MOTION_SENSOR_ENABLED: str | None = None
+    MOTION_FRAMEDIFF_ENABLED: str | None = None
+    MOTION_SERVICE_ENABLED: str | None = None
+    HIDRIVE_USER: str | None = None
+    HIDRIVE_PASSWORD: str | None = None
+    HIDRIVE_TARGET_DIR: str | None = None
+    UPLOAD_PHOTOS: str | None = None
+    UPLOAD_VIDEOS: str | None = None
+    UPLOAD_TIMELAPSES: str | None = None
+    UPLOAD_RETENTION_DAYS: str | None = None
+    UPLOAD_START_HOUR: str | None = None
+    UPLOAD_END_HOUR: str | None = None
+    WIFI_SSID: str | None = None
+    WIFI_PASSWORD: str | None = None
+    DETECTION_START_HOUR: str | None = None
+    DETECTION_END_HOUR: str | None = None
+    DAY_NIGHT_ENABLED: str | None = None
+    DAY_NIGHT_THRESHOLD: str | None = None
+    DAY_NIGHT_CHECK_INTERVAL: str | None = None
+
+
+@lru_cache(maxsize=1)
+def env_config() -> EnvConfig:
+    """Parse .env and the environment once per process."""
+    load_dotenv()
+    return EnvConfig(**{f.name: os.getenv(f.name) for f in fields(EnvConfig)})
 
-    # Scheduler
-    SCHEDULER_ENABLED = _env("SCHEDULER_ENABLED", "1")
 
-    # Logging
-    # Use local logs directory in development, /var/log/birdshome in production
-    default_log_dir = "/var/log/birdshome" if _env("FLASK_ENV") == "production" else "logs"
-    LOG_DIR = _env("LOG_DIR", default_log_dir)
-    LOG_FILE = _env("LOG_FILE", "birdshome.log")
-    LOG_MAX_BYTES = int(_env("LOG_MAX_BYTES", str(10 * 1024 * 1024)))  # 10MB
-    LOG_BACKUP_COUNT = int(_env("LOG_BACKUP_COUNT", "5"))
+def _env(key: str, default: str | None = None) -> str | None:
+    value = getattr(env_config(), key)
+    return default if value is None else value
 
-# Feature toggles
-    LOG_ENABLED_DEFAULT = _env("LOG_ENABLED", "1")
-    LOG_LEVEL_DEFAULT = _env("LOG_LEVEL", "INFO")
 
-    DEFAULT_SETTINGS = {
+@lru_cache(maxsize=1)
+def default_settings() -> Mapping[str, str | None]:
+    """Default values for all runtime settings (read-only, built once per process)."""
+    return MappingProxyType({
         C.STREAM_MODE: _env(C.STREAM_MODE, C.MODE_HLS),
         C.STREAM_RES: _env(C.STREAM_RES, "640x480"),
         C.STREAM_FPS: _env(C.STREAM_FPS, "30"),
         C.RECORD_RES: _env(C.RECORD_RES, "640x480"),
         C.RECORD_FPS: _env(C.RECORD_FPS, "30"),
         C.VIDEO_ROTATION: _env(C.VIDEO_ROTATION, "0"),
+        C.VIDEO_ENCODER: _env(C.VIDEO_ENCODER, "copy"),
         C.VIDEO_SOURCE: _env(C.VIDEO_SOURCE, "v4l2 -i /dev/video0"),
         C.AUDIO_SOURCE: _env(C.AUDIO_SOURCE, "-f alsa -i plughw:3,0"),
         C.STREAM_UDP_URL: _env(C.STREAM_UDP_URL, "udp://127.0.0.1:5004?pkt_size=1316&reuse=1&overrun_nonfatal=1&fifo_size=5000000"),
@@ -109,4 +160,62 @@ class Config:
         C.DAY_NIGHT_ENABLED: _env(C.DAY_NIGHT_ENABLED, "0"),
         C.DAY_NIGHT_THRESHOLD: _env(C.DAY_NIGHT_THRESHOLD, "30.0"),
         C.DAY_NIGHT_CHECK_INTERVAL: _env(C.DAY_NIGHT_CHECK_INTERVAL, "60.0"),
-    }
+    })
+
+
+class Config:
+    # Flask
+    SECRET_KEY = _env("SECRET_KEY", "change-me")
+    SQLALCHEMY_DATABASE_URI = _env("DATABASE_URL", "sqlite:///birdshome.db")
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    SESSION_COOKIE_NAME = C.SESSION_COOKIE_NAME
+    SESSION_COOKIE_HTTPONLY = True
+    SESSION_COOKIE_SAMESITE = "Lax"
+    SESSION_COOKIE_SECURE = True
+
+    REMEMBER_COOKIE_HTTPONLY = True
+    REMEMBER_COOKIE_SAMESITE = "Lax"
+    SESSION_COOKIE_SECURE = _env("TLS_MODE", "letsencrypt") != "none"
+    REMEMBER_COOKIE_SECURE = SESSION_COOKIE_SECURE
+
+    PREFERRED_URL_SCHEME = "https"
+
+    # CSRF
+    CSRF_COOKIE_NAME = C.CSRF_COOKIE_NAME
+
+    # Streaming / ffmpeg
+    FFMPEG_BIN = _env("FFMPEG_BIN", "ffmpeg")
+    VIDEO_SOURCE = _env("VIDEO_SOURCE")
+    AUDIO_SOURCE = _env("AUDIO_SOURCE", "-f alsa -i plughw:3,0")
+    # Probe every motion clip for its real duration/resolution (one ffprobe per clip)
+    VERIFY_WITH_FFPROBE = _env("VERIFY_WITH_FFPROBE", "0")
+
+    # Let nginx send /media files via X-Accel-Redirect (see scripts/nginx_*.conf)
+    USE_X_ACCEL = _env("USE_X_ACCEL", "0")
+
+    # Seconds /healthz reuses the last full healthcheck run
+    HEALTHCHECK_CACHE_TTL = float(_env("HEALTHCHECK_CACHE_TTL", "5"))
+
+    # Bootstrap admin (password is managed in database, not in .env)
+    ADMIN_USERNAME = _env("ADMIN_USERNAME", "admin")
+
+    # Internal control token (used by local system services to call internal endpoints)
+    INTERNAL_TOKEN = _env("INTERNAL_TOKEN", "change-me")
+
+    # Scheduler
+    SCHEDULER_ENABLED = _env("SCHEDULER_ENABLED", "1")
+
+    # Logging
+    # Use local logs directory in development, /var/log/birdshome in production
+    default_log_dir = "/var/log/birdshome" if _env("FLASK_ENV") == "production" else "logs"
+    LOG_DIR = _env("LOG_DIR", default_log_dir)
+    LOG_FILE = _env("LOG_FILE", "birdshome.log")
+    LOG_MAX_BYTES = int(_env("LOG_MAX_BYTES", str(10 * 1024 * 1024)))  # 10MB
+    LOG_BACKUP_COUNT = int(_env("LOG_BACKUP_COUNT", "5"))
+
+# Feature toggles
+    LOG_ENABLED_DEFAULT = _env("LOG_ENABLED", "1")
+    LOG_LEVEL_DEFAULT = _env("LOG_LEVEL", "INFO")
+
+    DEFAULT_SETTINGS = default_settings()
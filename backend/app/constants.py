@@ -11,6 +11,7 @@ AUDIO_SOURCE = "AUDIO_SOURCE"
 STREAM_UDP_URL = "STREAM_UDP_URL"
 MOTION_SOURCE = "MOTION_SOURCE"
 VIDEO_ROTATION = "VIDEO_ROTATION"  # 0, 90, 180, 270
+VIDEO_ENCODER = "VIDEO_ENCODER"  # copy | h264_v4l2m2m | h264_nvenc | libx264
 HLS_SEGMENT_SECONDS = "HLS_SEGMENT_SECONDS"
 HLS_PLAYLIST_SIZE = "HLS_PLAYLIST_SIZE"
 PREFIX = "PREFIX"
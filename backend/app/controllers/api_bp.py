@@ -1,20 +1,30 @@
 from __future__ import annotations
 
+import heapq
+import hmac
 import os
+import queue
+import re
 import secrets
+import threading
 import time
-from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, wraps
+from operator import itemgetter
 
 import psutil
-from flask import Blueprint, jsonify, request, current_app, make_response
+from flask import Blueprint, jsonify, request, current_app, make_response, g
 from flask_login import login_required, login_user, logout_user, current_user
+import sqlalchemy as sa
 
 from .. import constants as C
+from .. import get_process_stats, get_system_cpu_percent
 from ..extensions import db
+from ..json_provider import serializes_datetime
 from ..models import Setting, User, BioEvent, Photo, Video, Timelapse
 from ..services.stream_service import stream_service
 from ..services.healthcheck_service import healthcheck_service
-from ..services.motion_service import motion_service
+from ..services.motion_service import MOTION_SETTING_KEYS, motion_service
 from ..services.upload_service import upload_service
 from ..services.webrtc_service import webrtc_service
 from ..services.day_night_service import day_night_service
@@ -28,7 +38,7 @@ def _internal_auth() -> bool:
     remote = request.remote_addr or ""
     if remote not in ("127.0.0.1", "::1"):
         return False
-    return bool(expected) and expected != "change-me" and token == expected
+    return bool(expected) and expected != "change-me" and hmac.compare_digest(token.encode(), expected.encode())
 
 
 def internal_required(fn):
@@ -41,6 +51,15 @@ def internal_required(fn):
 
 
 
+def _request_is_secure() -> bool:
+    """Whether the client connected over HTTPS, computed once per request."""
+    secure = getattr(g, "_is_secure", None)
+    if secure is None:
+        secure = request.is_secure or request.headers.get('X-Forwarded-Proto') == 'https'
+        g._is_secure = secure
+    return secure
+
+
 def _ensure_csrf_cookie(resp):
     token = request.cookies.get(C.CSRF_COOKIE_NAME)
     if not token:
@@ -50,7 +69,7 @@ def _ensure_csrf_cookie(resp):
             token,
             httponly=False,
             samesite="Lax",
-            secure=request.is_secure or request.headers.get('X-Forwarded-Proto') == 'https',
+            secure=_request_is_secure(),
         )
     return resp
 
@@ -60,24 +79,28 @@ def csrf_protect(fn):
     def wrapper(*args, **kwargs):
         cookie_token = request.cookies.get(C.CSRF_COOKIE_NAME, "")
         header_token = request.headers.get(C.CSRF_HEADER_NAME, "")
-        if not cookie_token or not header_token or cookie_token != header_token:
+        if not cookie_token or not header_token or not hmac.compare_digest(cookie_token.encode(), header_token.encode()):
             return jsonify({"error": "csrf_failed"}), 403
         return fn(*args, **kwargs)
 
     return wrapper
 
 
-def _get_setting(key: str) -> str | None:
-    row = Setting.query.filter_by(key=key).first()
-    return row.value if row else None
+def _get_settings(keys) -> dict[str, str]:
+    """Stored values for the given keys, fetched in a single query."""
+    rows = Setting.query.with_entities(Setting.key, Setting.value).filter(Setting.key.in_(list(keys))).all()
+    return dict(rows)
 
 
-def _set_setting(key: str, value: str) -> None:
-    row = Setting.query.filter_by(key=key).first()
-    if row:
-        row.value = value
-    else:
-        db.session.add(Setting(key=key, value=value))
+def _set_settings_bulk(pairs: dict) -> None:
+    """Insert or update several settings in a single transaction."""
+    existing = {row.key: row for row in Setting.query.filter(Setting.key.in_(list(pairs))).all()}
+    for key, value in pairs.items():
+        row = existing.get(key)
+        if row:
+            row.value = value
+        else:
+            db.session.add(Setting(key=key, value=value))
     db.session.commit()
 
 
@@ -98,22 +121,37 @@ def _restart_stream_service() -> None:
         logging.getLogger(__name__).error(f"Failed to restart stream service: {e}")
 
 
+# Settings that should be persisted to .env
+_ENV_KEYS = frozenset({
+    'STREAM_RES', 'STREAM_FPS', 'STREAM_BITRATE', 'VIDEO_SOURCE',
+    'AUDIO_SOURCE', 'VIDEO_ROTATION', 'STREAM_UDP_URL',
+    'TIMELAPSE_INTERVAL_S', 'TIMELAPSE_FPS',
+    'RECORD_RES', 'RECORD_FPS', 'VIDEO_ENCODER',
+    'MOTION_THRESHOLD', 'MOTION_DURATION_S', 'MOTION_COOLDOWN_S',
+    'PREFIX', 'ADMIN_USERNAME'
+})
+# Values matching this can be written to .env unquoted
+_ENV_SAFE_RE = re.compile(r"[A-Za-z0-9_./:@+\-]+")
+# Log file lines: "2025-01-31 12:34:56 INFO     [logger] message"
+_LOG_LINE_RE = re.compile(r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) (\w+)\s+\[([^\]]+)\] (.*)$')
+# Syslog priority names, indexed by journald PRIORITY (0-7)
+_PRIO = ("EMERG", "ALERT", "CRIT", "ERROR", "WARNING", "NOTICE", "INFO", "DEBUG")
+
+
+def _format_env_line(key: str, value) -> str:
+    """Format a KEY=value line, quoting the value if needed."""
+    if _ENV_SAFE_RE.fullmatch(value or ""):
+        return f"{key}={value}"
+    # Escape quotes and backslashes
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+    return f'{key}="{escaped}"'
+
+
 def _sync_settings_to_env(settings: dict) -> None:
     """Sync important settings to .env file for persistence across restarts."""
-    import re
     from pathlib import Path
     import logging
 
-    # Settings that should be persisted to .env
-    env_keys = {
-        'STREAM_RES', 'STREAM_FPS', 'STREAM_BITRATE', 'VIDEO_SOURCE',
-        'AUDIO_SOURCE', 'VIDEO_ROTATION', 'STREAM_UDP_URL',
-        'TIMELAPSE_INTERVAL_S', 'TIMELAPSE_FPS',
-        'RECORD_RES', 'RECORD_FPS',
-        'MOTION_THRESHOLD', 'MOTION_DURATION_S', 'MOTION_COOLDOWN_S',
-        'PREFIX', 'ADMIN_USERNAME'
-    }
-
     logger = logging.getLogger(__name__)
 
     # Get .env file path
@@ -121,8 +159,8 @@ def _sync_settings_to_env(settings: dict) -> None:
         from flask import current_app as app
         backend_dir = Path(app.root_path).parent
     except RuntimeError:
-        # No app context in background thread, use relative path
-        backend_dir = Path(__file__).parent.parent
+        # No app context in background thread, use path relative to this file
+        backend_dir = Path(__file__).resolve().parents[2]
 
     env_file = backend_dir / '.env'
 
@@ -134,49 +172,140 @@ def _sync_settings_to_env(settings: dict) -> None:
         # Read existing .env content
         lines = env_file.read_text(encoding='utf-8').splitlines()
 
-        # Update or add settings
-        updated_keys = set()
-        new_lines = []
-
-        for line in lines:
+        # Index the lines of the keys we sync (last occurrence wins, as in dotenv)
+        idx = {}
+        for i, line in enumerate(lines):
             stripped = line.strip()
             if not stripped or stripped.startswith('#') or '=' not in stripped:
-                new_lines.append(line)
                 continue
-
             key = stripped.split('=', 1)[0].strip()
+            if key in _ENV_KEYS:
+                idx[key] = i
 
-            # Update if key is in settings and should be synced
-            if key in env_keys and key in settings:
-                value = settings[key]
-                # Check if value needs quoting
-                if re.fullmatch(r"[A-Za-z0-9_./:@+\-]+", value or ""):
-                    new_lines.append(f"{key}={value}")
-                else:
-                    # Escape quotes and backslashes
-                    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
-                    new_lines.append(f'{key}="{escaped}"')
-                updated_keys.add(key)
+        # Update keys in place, append the ones that weren't in the file
+        for key, value in settings.items():
+            if key not in _ENV_KEYS:
+                continue
+            if key in idx:
+                lines[idx[key]] = _format_env_line(key, value)
             else:
-                new_lines.append(line)
-
-        # Add new keys that weren't in the file
-        for key in env_keys:
-            if key in settings and key not in updated_keys:
-                value = settings[key]
-                if re.fullmatch(r"[A-Za-z0-9_./:@+\-]+", value or ""):
-                    new_lines.append(f"{key}={value}")
-                else:
-                    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
-                    new_lines.append(f'{key}="{escaped}"')
-
-        # Write back to .env
-        env_file.write_text('\n'.join(new_lines) + '\n', encoding='utf-8')
+                lines.append(_format_env_line(key, value))
+
+        # Write back to .env atomically (temp file + rename) so a crash cannot truncate it
+        tmp = env_file.with_name(env_file.name + '.tmp')
+        try:
+            tmp.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+            # Keep the original permissions; .env holds secrets
+            os.chmod(tmp, env_file.stat().st_mode & 0o7777)
+            os.replace(tmp, env_file)
+        finally:
+            tmp.unlink(missing_ok=True)
         logger.info(f"Synced {len(settings)} settings to .env file")
 
     except Exception as e:
         logger.error(f"Failed to sync settings to .env: {e}")
 
+
+def _ttl_cache(ttl: float):
+    """Cache a function's result per positional arguments for ttl seconds (per worker)."""
+    def decorator(fn):
+        cache: dict = {}  # args -> (value, expiry)
+
+        @wraps(fn)
+        def wrapper(*args):
+            now = time.monotonic()
+            hit = cache.get(args)
+            if hit is None or now >= hit[1]:
+                hit = (fn(*args), now + ttl)
+                cache[args] = hit
+            return hit[0]
+
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
+
+
+# Seconds the .env writer waits to coalesce bursts of settings saves.
+ENV_SYNC_COALESCE_S = 0.2
+_env_queue: queue.Queue = queue.Queue()
+_env_writer_lock = threading.Lock()
+_env_writer: threading.Thread | None = None
+
+
+def _queue_env_sync(settings: dict) -> None:
+    """Hand settings to the single background .env writer."""
+    global _env_writer
+    with _env_writer_lock:
+        if _env_writer is None or not _env_writer.is_alive():
+            _env_writer = threading.Thread(target=_env_writer_loop, daemon=True, name="env-sync")
+            _env_writer.start()
+    _env_queue.put(dict(settings))
+
+
+def _env_writer_loop() -> None:
+    """Write queued settings to .env, merging saves that arrive close together."""
+    while True:
+        merged = _env_queue.get()
+        time.sleep(ENV_SYNC_COALESCE_S)
+        while True:
+            try:
+                merged.update(_env_queue.get_nowait())
+            except queue.Empty:
+                break
+        _sync_settings_to_env(merged)
+        if not MOTION_SETTING_KEYS.isdisjoint(merged):
+            # systemctl call and SIGHUP stay off the request path
+            motion_service.notify_settings_changed()
+
+
+# Seconds a worker reuses the dashboard video count; dashboards poll often.
+# Inserts/deletes in the same worker invalidate it right away.
+VIDEO_COUNT_TTL = 30.0
+# Seconds a worker reuses a serialized gallery listing (per filter).
+# Media inserts/deletes in the same worker invalidate it right away.
+GALLERY_TTL = 5.0
+# Seconds a worker reuses memory/disk/temperature readings for status pages.
+SYSTEM_STATS_TTL = 1.5
+
+
+@_ttl_cache(VIDEO_COUNT_TTL)
+def _video_count() -> int:
+    """Number of videos."""
+    # Plain COUNT(id) instead of Query.count(), which wraps a subquery.
+    return db.session.query(db.func.count(Video.id)).scalar() or 0
+
+
+@sa.event.listens_for(Video, "after_insert")
+@sa.event.listens_for(Video, "after_delete")
+def _invalidate_video_count(mapper, connection, target) -> None:
+    _video_count.cache_clear()
+    _gallery_payload.cache_clear()
+
+
+@sa.event.listens_for(Photo, "after_insert")
+@sa.event.listens_for(Photo, "after_delete")
+@sa.event.listens_for(Timelapse, "after_insert")
+@sa.event.listens_for(Timelapse, "after_delete")
+def _invalidate_gallery(mapper, connection, target) -> None:
+    _gallery_payload.cache_clear()
+
+
+@_ttl_cache(SYSTEM_STATS_TTL)
+def _cached_virtual_memory():
+    return psutil.virtual_memory()
+
+
+@_ttl_cache(SYSTEM_STATS_TTL)
+def _cached_disk_usage():
+    return psutil.disk_usage("/")
+
+
+@_ttl_cache(SYSTEM_STATS_TTL)
+def _cached_sensors_temperatures():
+    return psutil.sensors_temperatures()
+
+
 @api.get("/dashboard/summary")
 def dashboard_summary():
     """Lightweight dashboard info (bird-focused)."""
@@ -189,19 +318,23 @@ def dashboard_summary():
     except Exception:
         stream_info = {"running": False, "mode": "HLS"}
 
-    # Last 10 photos
-    photos = Photo.query.order_by(Photo.created_at.desc()).limit(10).all()
+    # Last 10 photos (only the columns we need, no ORM objects)
+    photos = (
+        db.session.query(Photo.id, Photo.path, Photo.created_at)
+        .order_by(Photo.created_at.desc())
+        .limit(10)
+        .all()
+    )
     photo_items = [
         {
-            "id": p.id,
-            "url": "/media/" + p.path,
-            "timestamp": p.created_at.isoformat(),
+            "id": photo_id,
+            "url": "/media/" + path,
+            "timestamp": created_at.isoformat(),
         }
-        for p in photos
+        for photo_id, path, created_at in photos
     ]
 
-    # Video count
-    video_count = Video.query.count()
+    video_count = _video_count()
 
     return jsonify({
         "stream": stream_info,
@@ -260,18 +393,18 @@ def logout():
 # @login_required
 def status():
     """Get system status. Optimized to avoid blocking calls."""
-    # Use interval=0 for non-blocking CPU reading (uses cached value)
-    cpu = psutil.cpu_percent(interval=0)
+    # Non-blocking: value sampled by the CPU monitor of one worker
+    cpu = get_system_cpu_percent()
 
     # Fast memory and disk checks
-    vm = psutil.virtual_memory()
-    disk = psutil.disk_usage("/")
+    vm = _cached_virtual_memory()
+    disk = _cached_disk_usage()
 
     # CPU temperature - skip if not available or slow
     cpu_temp = None
     try:
         # Quick check with timeout - only if supported
-        temps = psutil.sensors_temperatures()
+        temps = _cached_sensors_temperatures()
         if temps:
             # Get first available temperature quickly
             for sensor_name, readings in temps.items():
@@ -288,12 +421,8 @@ def status():
             "cpu_temp": cpu_temp,
             "mem_percent": vm.percent,
             "disk_free_gb": round(disk.free / (1024**3), 2),
-            "stream": {
-                "running": stream.running,
-                "mode": stream.mode,
-                "pid": int(stream.pid or 0),
-                "started_at": (stream.started_at.isoformat() if getattr(stream, "started_at", None) else ""),
-            },
+            "process": get_process_stats(),
+            "stream": stream.to_dict(),
         }
         return jsonify(payload)
     except Exception:
@@ -312,10 +441,9 @@ def status():
 @api.get("/settings")
 @login_required
 def settings_get():
-    keys = list(current_app.config.get("DEFAULT_SETTINGS", {}).keys())
-    out = {}
-    for k in keys:
-        out[k] = _get_setting(k) or str(current_app.config["DEFAULT_SETTINGS"].get(k))
+    defaults = current_app.config.get("DEFAULT_SETTINGS", {})
+    stored = _get_settings(defaults.keys())
+    out = {k: stored.get(k) or str(v) for k, v in defaults.items()}
     return jsonify(out)
 
 
@@ -342,11 +470,14 @@ def settings_set():
     }
 
     # Update settings in database and check which services are affected
-    for k, v in data.items():
-        key = str(k)
-        value = v
+    updates = {str(k): v for k, v in data.items()}
+    _set_settings_bulk(updates)
+
+    if not MOTION_SETTING_KEYS.isdisjoint(updates):
+        # The motion service process is signalled by the env-sync thread
+        motion_service.reload_config()
 
-        _set_setting(key, value)
+    for key, value in updates.items():
         current_app.config[key] = value
 
         if key in stream_keys:
@@ -356,7 +487,7 @@ def settings_set():
 
     # Write important settings to .env file for persistence across restarts (async in background)
     from threading import Thread
-    Thread(target=_sync_settings_to_env, args=(data.copy(),), daemon=True).start()
+    _queue_env_sync(data)
 
     # Prepare restart info
     restart_results = {}
@@ -386,7 +517,7 @@ def settings_set():
 def stream_start():
     try:
         st = stream_service.start()
-        return jsonify({"ok": True, "status": st.__dict__})
+        return jsonify({"ok": True, "status": st.to_dict()})
     except NotImplementedError as e:
         return jsonify({"ok": False, "error": str(e)}), 501
 
@@ -396,7 +527,7 @@ def stream_start():
 @csrf_protect
 def stream_stop():
     st = stream_service.stop()
-    return jsonify({"ok": True, "status": st.__dict__})
+    return jsonify({"ok": True, "status": st.to_dict()})
 
 
 @api.post("/control/motion/start")
@@ -439,16 +570,7 @@ def motion_status():
 @api.get("/day-night/status")
 def day_night_status():
     """Get current day/night mode status."""
-    try:
-        status = day_night_service.get_status()
-        return jsonify({
-            "mode": status.mode.lower(),
-            "brightness": status.brightness,
-            "last_check": status.last_check,
-            "threshold": status.threshold
-        })
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    return jsonify(day_night_service.snapshot())
 
 
 @api.post("/day-night/mode")
@@ -483,13 +605,13 @@ def day_night_set_mode():
 @internal_required
 def internal_stream_start():
     st = stream_service.start()
-    return jsonify({"ok": True, "status": st.__dict__})
+    return jsonify({"ok": True, "status": st.to_dict()})
 
 @api.post("/internal/stream/stop")
 @internal_required
 def internal_stream_stop():
     st = stream_service.stop()
-    return jsonify({"ok": True, "status": st.__dict__})
+    return jsonify({"ok": True, "status": st.to_dict()})
 
 
 @api.post("/webrtc/offer")
@@ -497,7 +619,6 @@ def internal_stream_stop():
 @csrf_protect
 def webrtc_offer():
     """Handle WebRTC offer from client."""
-    import asyncio
     import uuid
 
     data = request.get_json()
@@ -506,34 +627,28 @@ def webrtc_offer():
 
     session_id = str(uuid.uuid4())
 
-    # Run async operations in event loop
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-
     try:
         # Create peer connection
-        result = loop.run_until_complete(
-            webrtc_service.create_peer_connection(session_id)
-        )
+        result = webrtc_service.run(webrtc_service.create_peer_connection(session_id))
 
         if "error" in result:
             return jsonify(result), 500
 
         # Handle offer and get answer
-        answer = loop.run_until_complete(
+        answer = webrtc_service.run(
             webrtc_service.handle_offer(session_id, data['sdp'], data.get('type', 'offer'))
         )
+    except TimeoutError:
+        return jsonify({"error": "timeout"}), 504
 
-        if "error" in answer:
-            return jsonify(answer), 500
+    if "error" in answer:
+        return jsonify(answer), 500
 
-        return jsonify({
-            "session_id": session_id,
-            "sdp": answer['sdp'],
-            "type": answer['type']
-        })
-    finally:
-        loop.close()
+    return jsonify({
+        "session_id": session_id,
+        "sdp": answer['sdp'],
+        "type": answer['type']
+    })
 
 
 @api.post("/webrtc/ice")
@@ -541,8 +656,6 @@ def webrtc_offer():
 @csrf_protect
 def webrtc_ice():
     """Handle ICE candidate from client."""
-    import asyncio
-
     data = request.get_json()
     if not data or 'session_id' not in data:
         return jsonify({"error": "Missing session_id"}), 400
@@ -550,20 +663,15 @@ def webrtc_ice():
     session_id = data['session_id']
     candidate = data.get('candidate')
 
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-
     try:
-        result = loop.run_until_complete(
-            webrtc_service.handle_ice_candidate(session_id, candidate)
-        )
+        result = webrtc_service.run(webrtc_service.handle_ice_candidate(session_id, candidate))
+    except TimeoutError:
+        return jsonify({"error": "timeout"}), 504
 
-        if "error" in result:
-            return jsonify(result), 500
+    if "error" in result:
+        return jsonify(result), 500
 
-        return jsonify(result)
-    finally:
-        loop.close()
+    return jsonify(result)
 
 
 @api.post("/webrtc/close")
@@ -571,31 +679,27 @@ def webrtc_ice():
 @csrf_protect
 def webrtc_close():
     """Close WebRTC peer connection."""
-    import asyncio
-
     data = request.get_json()
     if not data or 'session_id' not in data:
         return jsonify({"error": "Missing session_id"}), 400
 
     session_id = data['session_id']
 
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-
     try:
-        result = loop.run_until_complete(
-            webrtc_service.close_peer(session_id)
-        )
+        result = webrtc_service.run(webrtc_service.close_peer(session_id))
+    except TimeoutError:
+        return jsonify({"error": "timeout"}), 504
 
-        return jsonify(result)
-    finally:
-        loop.close()
+    return jsonify(result)
 
 
 @api.get("/healthz")
 #@login_required
 def healthz():
-    results = healthcheck_service.run()
+    # ?force=1 bypasses the short result cache; only for logged-in users since
+    # the checks upload to HiDrive
+    force = current_user.is_authenticated and request.args.get("force") == "1"
+    results = healthcheck_service.run(force=force)
     return jsonify({
         "results": [
             {"name": r.name, "status": "ok" if r.ok else "fail", "details": r.details, "duration": r.duration_ms}
@@ -646,8 +750,9 @@ def admin_health_check(check_name: str):
 @login_required
 def admin_health():
     """Extended health information for admin page including timers and services."""
-    import subprocess
-    from datetime import datetime, timedelta
+    from datetime import datetime
+
+    from ..services.systemd_utils import BIRDSHOME_TIMERS, units_properties, usec_to_datetime
 
     # Get basic health checks
     results = healthcheck_service.run()
@@ -657,12 +762,12 @@ def admin_health():
     ]
 
     # Get system info (like dashboard)
-    vm = psutil.virtual_memory()
-    disk = psutil.disk_usage("/")
-    cpu = psutil.cpu_percent(interval=0.1)
+    vm = _cached_virtual_memory()
+    disk = _cached_disk_usage()
+    cpu = get_system_cpu_percent()
     cpu_temp = None
     try:
-        temps = psutil.sensors_temperatures()
+        temps = _cached_sensors_temperatures()
         if temps:
             for sensor_name, readings in temps.items():
                 if readings:
@@ -674,93 +779,64 @@ def admin_health():
     # Get stream status
     try:
         stream = stream_service.status()
-        stream_info = {
-            "running": stream.running,
-            "mode": stream.mode,
-            "pid": int(stream.pid or 0),
-            "started_at": (stream.started_at.isoformat() if getattr(stream, "started_at", None) else ""),
-        }
+        stream_info = stream.to_dict()
     except Exception:
         stream_info = {"running": False, "mode": "HLS", "pid": 0, "started_at": ""}
 
+    # Timers and the snapshot service in one query (D-Bus, or a single systemctl)
+    states = units_properties(
+        (*BIRDSHOME_TIMERS, "birdshome-snapshot.service"),
+        "LoadState", "ActiveState", "NextElapseUSecRealtime", "ActiveEnterTimestamp",
+    )
+
     # Check systemd timers
     timers_info = []
     try:
-        # Get timer status
-        timer_result = subprocess.run(
-            ["systemctl", "list-timers", "--no-pager", "--no-legend", "birdshome-*"],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-
-        if timer_result.returncode == 0:
-            for line in timer_result.stdout.strip().split('\n'):
-                if not line.strip():
-                    continue
-                parts = line.split()
-                if len(parts) >= 6:
-                    timer_name = parts[-1] if parts[-1].endswith('.timer') else None
-                    if timer_name:
-                        next_run = ' '.join(parts[0:2])  # e.g., "Mon 2025-01-20"
-                        timers_info.append({
-                            "name": timer_name,
-                            "next": next_run,
-                            "active": "active" in line.lower()
-                        })
+        for timer_name in BIRDSHOME_TIMERS:
+            props = states.get(timer_name, {})
+            if props.get("LoadState") != "loaded":
+                continue
+            next_elapse = props.get("NextElapseUSecRealtime")
+            next_time = usec_to_datetime(next_elapse)
+            timers_info.append({
+                "name": timer_name,
+                "next": next_time.strftime("%a %Y-%m-%d %H:%M:%S") if next_time else str(next_elapse or ""),
+                "active": props.get("ActiveState") == "active",
+            })
     except Exception as e:
         timers_info = [{"error": str(e)}]
 
     # Check if snapshot service is active (last run)
     snapshot_status = {"active": False, "last_run": None, "last_status": "unknown"}
     try:
-        service_result = subprocess.run(
-            ["systemctl", "show", "birdshome-snapshot.service", "--property=ActiveState,ActiveEnterTimestamp,ExecMainStatus"],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-
-        if service_result.returncode == 0:
-            for line in service_result.stdout.strip().split('\n'):
-                if line.startswith("ActiveState="):
-                    snapshot_status["active"] = "active" in line.lower()
-                elif line.startswith("ActiveEnterTimestamp="):
-                    timestamp_str = line.split("=", 1)[1].strip()
-                    if timestamp_str and timestamp_str != "n/a":
-                        snapshot_status["last_run"] = timestamp_str
+        props = states.get("birdshome-snapshot.service", {})
+        snapshot_status["active"] = props.get("ActiveState") == "active"
+        entered = props.get("ActiveEnterTimestamp")
+        entered_time = usec_to_datetime(entered)
+        if entered_time:
+            snapshot_status["last_run"] = entered_time.astimezone().strftime("%a %Y-%m-%d %H:%M:%S %Z")
+        elif entered and entered != "n/a" and not str(entered).isdigit():
+            # systemctl already formats timestamps
+            snapshot_status["last_run"] = entered
     except Exception:
         pass
 
     # Calculate next timelapse generation
     next_timelapse = None
     try:
-        # Find next run time for timelapse timer
-        timer_result = subprocess.run(
-            ["systemctl", "show", "birdshome-timelapse.timer", "--property=NextElapseUSecRealtime"],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-
-        if timer_result.returncode == 0:
-            for line in timer_result.stdout.strip().split('\n'):
-                if line.startswith("NextElapseUSecRealtime="):
-                    # Parse microseconds since epoch
-                    usec_str = line.split("=", 1)[1].strip()
-                    if usec_str and usec_str != "0":
-                        usec = int(usec_str)
-                        next_time = datetime.fromtimestamp(usec / 1_000_000)
-                        now = datetime.now()
-                        delta = next_time - now
-                        hours = int(delta.total_seconds() // 3600)
-                        minutes = int((delta.total_seconds() % 3600) // 60)
-                        next_timelapse = {
-                            "time": next_time.isoformat(),
-                            "in_hours": hours,
-                            "in_minutes": minutes,
-                            "human": f"{hours}h {minutes}m" if hours > 0 else f"{minutes}m"
-                        }
+        props = states.get("birdshome-timelapse.timer", {})
+        next_time = usec_to_datetime(props.get("NextElapseUSecRealtime"))
+        if next_time:
+            now = datetime.now()
+            delta = next_time - now
+            hours = int(delta.total_seconds() // 3600)
+            minutes = int((delta.total_seconds() % 3600) // 60)
+            next_timelapse = {
+                "time": next_time.isoformat(),
+                "in_hours": hours,
+                "in_minutes": minutes,
+                "human": f"{hours}h {minutes}m" if hours > 0 else f"{minutes}m"
+            }
     except Exception:
         pass
 
@@ -782,12 +858,35 @@ def admin_health():
 @api.get("/bio/events")
 #@login_required
 def bio_events():
-    rows = BioEvent.query.order_by(BioEvent.event_date.desc()).limit(50).all()
+    rows = (
+        db.session.query(BioEvent.id, BioEvent.kind, BioEvent.event_date, BioEvent.notes)
+        .order_by(BioEvent.event_date.desc())
+        .limit(50)
+        .all()
+    )
     return jsonify([
-        {"id": r.id, "kind": r.kind, "date": r.event_date.isoformat(), "notes": r.notes or ""}
-        for r in rows
+        {"id": event_id, "kind": kind, "date": event_date.isoformat(), "notes": notes or ""}
+        for event_id, kind, event_date, notes in rows
     ])
 
+
+def _tail(path, n: int, chunk_size: int = 65536) -> list[str]:
+    """Last n lines of a text file, read backwards in chunks from the end."""
+    if n <= 0:
+        return []
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        buf = b''
+        # n+1 newlines guarantee n complete lines (the file usually ends with one)
+        while pos > 0 and buf.count(b'\n') <= n:
+            step = min(chunk_size, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+    return buf.decode('utf-8', errors='replace').splitlines()[-n:]
+
+
 @api.get("/admin/logs")
 @login_required
 def admin_logs():
@@ -800,15 +899,15 @@ def admin_logs():
     - search: search term to filter log lines
     - source: file|journald (default: file) - where to read logs from
     """
-    import subprocess
     from pathlib import Path
-    import re
 
     service = request.args.get("service", "all")
     level = request.args.get("level", "all")
     lines = min(int(request.args.get("lines", "500")), 5000)
     search_term = request.args.get("search", "")
     source = request.args.get("source", "file")
+    # Lowercased once; None skips the per-line search check entirely
+    search_lower = search_term.lower() if search_term else None
 
     # Map service names to log files and systemd units
     service_map = {
@@ -832,9 +931,6 @@ def admin_logs():
         else:
             return jsonify({"error": f"Unknown service: {service}"}), 400
 
-        # Pattern to parse log lines: "2025-01-31 12:34:56 INFO     [logger] message"
-        log_pattern = re.compile(r'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) (\w+)\s+\[([^\]]+)\] (.*)$')
-
         for service_name, log_file in log_files:
             log_path = log_dir / log_file
             if not log_path.exists():
@@ -842,26 +938,23 @@ def admin_logs():
 
             try:
                 # Read last N lines from log file
-                with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
-                    # Read all lines and take last N
-                    all_lines = f.readlines()
-                    recent_lines = all_lines[-lines:] if len(all_lines) > lines else all_lines
+                recent_lines = _tail(log_path, lines)
 
                 for line in recent_lines:
                     line = line.strip()
                     if not line:
                         continue
 
-                    match = log_pattern.match(line)
+                    match = _LOG_LINE_RE.match(line)
                     if match:
-                        timestamp_str, log_level, logger_name, message = match.groups()
+                        timestamp_str, log_level, logger_name, message = match.group(1, 2, 3, 4)
 
                         # Apply level filter
                         if level != "all" and log_level.upper() != level.upper():
                             continue
 
                         # Apply search filter
-                        if search_term and search_term.lower() not in message.lower():
+                        if search_lower is not None and search_lower not in message.lower():
                             continue
 
                         logs.append({
@@ -875,9 +968,6 @@ def admin_logs():
                 current_app.logger.error(f"Could not read log file {log_path}: {e}")
                 continue
 
-        # Sort by timestamp (newest first)
-        logs.sort(key=lambda x: x["timestamp"], reverse=True)
-
     else:
         # Read from journald (legacy fallback)
         if service == "all":
@@ -887,73 +977,41 @@ def admin_logs():
         else:
             return jsonify({"error": f"Unknown service: {service}"}), 400
 
+        from ..services.systemd_utils import journal_entries
+
+        priority_map = {
+            "ERROR": 3,
+            "WARNING": 4,
+            "INFO": 6,
+            "DEBUG": 7
+        }
         for unit in units:
-            try:
-                # Build journalctl command
-                cmd = ["journalctl", "-u", unit, "-n", str(lines), "--no-pager", "--output=json"]
-
-                # Add priority filter if specified
-                if level != "all":
-                    priority_map = {
-                        "ERROR": "3",
-                        "WARNING": "4",
-                        "INFO": "6",
-                        "DEBUG": "7"
-                    }
-                    if level in priority_map:
-                        cmd.extend(["-p", priority_map[level]])
-
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-
-                if result.returncode == 0:
-                    # Parse JSON logs
-                    import json
-                    for line in result.stdout.strip().split('\n'):
-                        if not line:
-                            continue
-                        try:
-                            entry = json.loads(line)
-                            message = entry.get("MESSAGE", "")
-
-                            # Apply search filter
-                            if search_term and search_term.lower() not in message.lower():
-                                continue
-
-                            # Extract service name from unit
-                            service_name = unit.replace("birdshome-", "").replace(".service", "")
-                            if service_name == "birdshome":
-                                service_name = "main"
-
-                            priority_names = {
-                                "0": "EMERG",
-                                "1": "ALERT",
-                                "2": "CRIT",
-                                "3": "ERROR",
-                                "4": "WARNING",
-                                "5": "NOTICE",
-                                "6": "INFO",
-                                "7": "DEBUG"
-                            }
-
-                            logs.append({
-                                "timestamp": entry.get("__REALTIME_TIMESTAMP", "0"),
-                                "service": service_name,
-                                "level": priority_names.get(entry.get("PRIORITY", "6"), "INFO"),
-                                "message": message,
-                            })
-                        except json.JSONDecodeError:
-                            continue
+            # Extract service name from unit
+            service_name = unit.replace("birdshome-", "").replace(".service", "")
+            if service_name == "birdshome":
+                service_name = "main"
 
-            except subprocess.TimeoutExpired:
-                continue
-            except Exception as e:
-                continue
+            for entry in journal_entries(unit, lines, priority_map.get(level)):
+                message = entry.get("MESSAGE", "")
 
-        # Sort by timestamp (newest first)
-        logs.sort(key=lambda x: x["timestamp"], reverse=True)
+                # Apply search filter
+                if search_lower is not None and search_lower not in message.lower():
+                    continue
+
+                try:
+                    level_name = _PRIO[int(entry.get("PRIORITY", 6))]
+                except (ValueError, IndexError):
+                    level_name = "INFO"
 
-    # Limit to requested number of lines
-    logs = logs[:lines]
+                logs.append({
+                    "timestamp": entry.get("__REALTIME_TIMESTAMP", "0"),
+                    "service": service_name,
+                    "level": level_name,
+                    "message": message,
+                })
+
+    # Newest `lines` entries by timestamp, without sorting everything read
+    logs = heapq.nlargest(lines, logs, key=itemgetter("timestamp"))
 
     return jsonify({
         "logs": logs,
@@ -970,52 +1028,129 @@ def admin_logs():
 def media_gallery():
     """Unified gallery list.
 
-    Returns items compatible with the React GalleryPage.
+    Returns items compatible with the React GalleryPage. Pass the
+    ``timestamp`` and ``id`` of the last item as ``before`` and
+    ``before_id`` to get the next (older) page.
     """
     filter_mode = request.args.get("filter", "all")  # all|birds|nobirds
+    if filter_mode not in ("birds", "nobirds"):
+        filter_mode = "all"
 
-    items: list[dict] = []
+    # Keyset pagination: ?before=<timestamp>&before_id=<id, e.g. "video-12">
+    # of the last item of the previous page. The id breaks timestamp ties.
+    before = request.args.get("before")
+    if before:
+        from datetime import datetime
 
-    for v in Video.query.order_by(Video.created_at.desc()).limit(100).all():
-        if filter_mode == "birds" and not v.has_birds:
-            continue
-        if filter_mode == "nobirds" and v.has_birds:
-            continue
-        items.append({
-            "id": f"video-{v.id}",
-            "type": "video",
-            "url": "/media/" + v.path,
-            "thumbnail": "/media/" + v.path,  # placeholder; generate thumbnails if needed
-            "timestamp": v.created_at.isoformat(),
-            "hasBird": bool(v.has_birds),
-        })
+        try:
+            before_ts = datetime.fromisoformat(before)
+        except ValueError:
+            return jsonify({"error": "invalid_before"}), 400
+        before_id = request.args.get("before_id")
+        if before_id:
+            before_type, _, raw_id = before_id.partition("-")
+            try:
+                cursor = (before_ts, before_type, int(raw_id))
+            except ValueError:
+                return jsonify({"error": "invalid_before_id"}), 400
+        else:
+            # Sorts before every (type, id): only strictly older items
+            cursor = (before_ts, "", -1)
+        payload = _build_gallery_payload(filter_mode, cursor)
+    else:
+        payload = _gallery_payload(filter_mode)
+    return current_app.response_class(payload, mimetype="application/json")
 
-    for p in Photo.query.order_by(Photo.created_at.desc()).limit(100).all():
-        items.append({
-            "id": f"photo-{p.id}",
-            "type": "photo",
-            "url": "/media/" + p.path,
-            "thumbnail": "/media/" + p.path,
-            "timestamp": p.created_at.isoformat(),
-            "hasBird": True,
-        })
 
-    for t in Timelapse.query.order_by(Timelapse.created_at.desc()).limit(50).all():
-        url = "/media/" + t.path
-        if t.path.startswith("timelapse_video/"):
-            url = "/timelapse_video/" + t.path.split("/", 1)[1]
+@_ttl_cache(GALLERY_TTL)
+def _gallery_payload(filter_mode: str) -> bytes:
+    """Serialized first gallery page (the one the frontend polls)."""
+    return _build_gallery_payload(filter_mode, None)
 
+
+@lru_cache(maxsize=None)
+def _gallery_stmt(filter_mode: str, paged: bool):
+    """Gallery query for a filter, built once per process.
+
+    Reusing the same statement object lets SQLAlchemy skip rebuilding the
+    construct and its cache key; the compiled SQL comes from the engine's
+    statement cache. Paged variants take the cursor as the "before_ts",
+    "before_type" and "before_id" parameters.
+    """
+    videos = sa.select(
+        Video.id, sa.literal("video").label("type"), Video.path, Video.created_at,
+        Video.has_birds.label("has_birds"),
+    )
+    if filter_mode == "birds":
+        videos = videos.where(Video.has_birds.is_(True))
+    elif filter_mode == "nobirds":
+        videos = videos.where(Video.has_birds.is_(False))
+    photos = sa.select(
+        Photo.id, sa.literal("photo").label("type"), Photo.path, Photo.created_at,
+        sa.literal(True).label("has_birds"),
+    )
+    timelapses = sa.select(
+        Timelapse.id, sa.literal("timelapse").label("type"), Timelapse.path, Timelapse.created_at,
+        sa.literal(True).label("has_birds"),
+    )
+
+    # Newest N of each type (as subqueries so SQLite accepts the inner LIMITs),
+    # merged and sorted in a single statement. Items are ordered by
+    # (created_at, type, id), so the cursor is unique even when timestamps
+    # tie. Each part is an index seek on created_at, starting at the cursor
+    # when paging.
+    parts = []
+    for q, n in ((videos, 100), (photos, 100), (timelapses, 50)):
+        cols = q.selected_columns
+        if paged:
+            before_ts = sa.bindparam("before_ts")
+            q = q.where(
+                cols.created_at <= before_ts,
+                sa.tuple_(cols.created_at, cols.type, cols.id)
+                < sa.tuple_(before_ts, sa.bindparam("before_type"), sa.bindparam("before_id")),
+            )
+        parts.append(sa.select(q.order_by(cols.created_at.desc(), cols.id.desc()).limit(n).subquery()))
+    merged = sa.union_all(*parts).subquery()
+    return (
+        sa.select(merged)
+        .order_by(merged.c.created_at.desc(), merged.c.type.desc(), merged.c.id.desc())
+        .limit(200)
+    )
+
+
+def _build_gallery_payload(filter_mode: str, before) -> bytes:
+    """Serialized gallery items after the ``(timestamp, type, id)`` cursor ``before`` (newest first)."""
+    if before is None:
+        rows = db.session.execute(_gallery_stmt(filter_mode, False)).all()
+    else:
+        before_ts, before_type, before_id = before
+        rows = db.session.execute(
+            _gallery_stmt(filter_mode, True),
+            {"before_ts": before_ts, "before_type": before_type, "before_id": before_id},
+        ).all()
+
+    # orjson formats datetimes itself (same output as isoformat()), in C.
+    raw_datetimes = serializes_datetime(current_app)
+
+    items: list[dict] = []
+    for item_id, item_type, path, created_at, has_birds in rows:
+        url = "/media/" + path
+        if item_type == "timelapse" and path.startswith("timelapse_video/"):
+            url = "/timelapse_video/" + path.split("/", 1)[1]
         items.append({
-            "id": f"timelapse-{t.id}",
-            "type": "timelapse",
+            "id": f"{item_type}-{item_id}",
+            "type": item_type,
             "url": url,
-            "thumbnail": url,
-            "timestamp": t.created_at.isoformat(),
-            "hasBird": True,
+            "thumbnail": url,  # placeholder; generate thumbnails if needed
+            "timestamp": created_at if raw_datetimes else created_at.isoformat(),
+            "hasBird": bool(has_birds),
         })
 
-    items.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-    return jsonify(items[:200])
+    return current_app.json.dumps(items, separators=(",", ":")).encode()
+
+
+# Media type as used in gallery ids ("photo-12") -> model
+MODEL_BY_TYPE = {"photo": Photo, "video": Video, "timelapse": Timelapse}
 
 
 @api.delete("/media/delete")
@@ -1036,34 +1171,21 @@ def media_delete():
     except (ValueError, AttributeError):
         return jsonify({"error": "invalid_id_format"}), 400
 
-    # Find and delete the item
-    item = None
-    file_path = None
-
-    # Get media root directory
-    from pathlib import Path
-    media_root = Path(current_app.config.get("MEDIA_ROOT", "data")).resolve()
-
-    if item_type == "photo" and prefix == "photo":
-        item = Photo.query.get(numeric_id)
-        if item:
-            file_path = media_root / item.path
-    elif item_type == "video" and prefix == "video":
-        item = Video.query.get(numeric_id)
-        if item:
-            file_path = media_root / item.path
-    elif item_type == "timelapse" and prefix == "timelapse":
-        item = Timelapse.query.get(numeric_id)
-        if item:
-            file_path = media_root / item.path
-    else:
+    model = MODEL_BY_TYPE.get(item_type)
+    if model is None or prefix != item_type:
         return jsonify({"error": "unsupported_type"}), 400
 
-    if not item:
+    # Only the path is needed, no need to load the whole row
+    path = db.session.execute(
+        sa.select(model.path).where(model.id == numeric_id)
+    ).scalar_one_or_none()
+    if path is None:
         return jsonify({"error": "not_found"}), 404
 
+    file_path = current_app.config["MEDIA_ROOT_RESOLVED"] / path
+
     # Delete physical file if exists
-    if file_path and file_path.exists():
+    if file_path.exists():
         try:
             file_path.unlink()
             current_app.logger.info(f"Deleted file: {file_path}")
@@ -1072,9 +1194,14 @@ def media_delete():
             return jsonify({"error": f"Failed to delete file: {str(e)}"}), 500
 
     # Delete database entry
-    db.session.delete(item)
+    db.session.execute(sa.delete(model).where(model.id == numeric_id))
     db.session.commit()
 
+    # Bulk DELETE bypasses the mapper events, invalidate explicitly
+    if model is Video:
+        _video_count.cache_clear()
+    _gallery_payload.cache_clear()
+
     return jsonify({"ok": True})
 
 
@@ -1121,21 +1248,35 @@ def upload_test():
 @api.get("/control/daynight/status")
 def daynight_status():
     """Get current day/night mode status."""
-    try:
-        status = day_night_service.get_status()
-        # Map backend mode to frontend mode
-        mode = status.mode.lower()  # "DAY" -> "day", "NIGHT" -> "night"
-        auto_enabled = day_night_service._running
+    return jsonify(day_night_service.snapshot())
+
+# Single worker for stream restarts after day/night switches; rapid toggles
+# coalesce into one pending restart instead of a thread each.
+_restart_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="daynight-restart")
+_restart_pending = threading.Event()
+
+
+def _queue_stream_restart(app) -> None:
+    """Schedule a stream restart unless one is already waiting to run."""
+    if _restart_pending.is_set():
+        return
+    _restart_pending.set()
+    _restart_executor.submit(_restart_stream, app)
+
+
+def _restart_stream(app) -> None:
+    # Cleared before reading settings, so a switch arriving during the
+    # restart queues another one with the newer mode.
+    _restart_pending.clear()
+    with app.app_context():
+        # Restart UDP source with new camera settings (IR filter, etc.)
+        stream_service.restart_udp_source()
+        # If HLS stream is running, restart it too. stop() returns once
+        # the old ffmpeg has exited, so start() can follow right away.
+        if stream_service.is_running():
+            stream_service.stop()
+            stream_service.start()
 
-        return jsonify({
-            "mode": mode,
-            "auto_enabled": auto_enabled,
-            "brightness": status.brightness,
-            "last_check": status.last_check,
-            "threshold": status.threshold
-        })
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
 
 @api.post("/control/daynight/switch")
 @csrf_protect
@@ -1164,20 +1305,7 @@ def daynight_switch():
         day_night_service.set_mode(backend_mode)
 
         # Restart UDP source to apply new day/night mode settings (asynchronously to avoid blocking)
-        from threading import Thread
-        app = current_app._get_current_object()
-
-        def _restart_stream():
-            with app.app_context():
-                # Restart UDP source with new camera settings (IR filter, etc.)
-                stream_service.restart_udp_source()
-                # If HLS stream is running, restart it too
-                if stream_service.is_running():
-                    stream_service.stop()
-                    time.sleep(1)
-                    stream_service.start()
-
-        Thread(target=_restart_stream, daemon=True).start()
+        _queue_stream_restart(current_app._get_current_object())
 
         return jsonify({"ok": True, "mode": mode})
     except Exception as e:
@@ -1186,18 +1314,7 @@ def daynight_switch():
 @api.get("/control/daynight/mode")
 def daynight_mode():
     """Get current day/night mode status."""
-    try:
-        status = day_night_service.get_status()
-        if status.mode == "DAY":
-            return jsonify({"mode": "auto", "brightness": status.brightness})
-        return jsonify({
-            "mode": status.mode,
-            "brightness": status.brightness,
-            "last_check": status.last_check,
-            "threshold": status.threshold
-        })
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    return jsonify(day_night_service.snapshot())
 
 @api.post("/control/daynight/start")
 @csrf_protect
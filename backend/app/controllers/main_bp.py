@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import hashlib
 from pathlib import Path
+from urllib.parse import quote
 
-from flask import Blueprint, abort, current_app, send_from_directory
+from flask import Blueprint, abort, current_app, request, send_from_directory
 
 main = Blueprint("main", __name__)
 
+# nginx "internal" location aliased to MEDIA_ROOT (see scripts/nginx_*.conf)
+X_ACCEL_MEDIA_PREFIX = "/_media_internal/"
+
 
 @main.get("/assets/<path:filename>")
 def spa_assets(filename: str):
@@ -18,31 +23,57 @@ def spa_assets(filename: str):
 @main.get("/media/<path:relpath>")
 def media(relpath: str):
     """Serve gallery assets stored under MEDIA_ROOT."""
-    media_root = Path(current_app.config.get("MEDIA_ROOT", "data")).resolve()
+    media_root = current_app.config["MEDIA_ROOT_RESOLVED"]
+    # Resolving the file as well rejects symlinks pointing out of MEDIA_ROOT.
+    # A prefix string check would also accept siblings like "data-old".
     full = (media_root / relpath).resolve()
-    if not str(full).startswith(str(media_root)):
-        abort(404)
-    if not full.exists():
+    if not full.is_relative_to(media_root):
         abort(404)
+    if current_app.config["USE_X_ACCEL"]:
+        # Access is checked here; nginx sends the file (ranges, sendfile)
+        resp = current_app.response_class()
+        resp.headers["X-Accel-Redirect"] = X_ACCEL_MEDIA_PREFIX + quote(relpath)
+        # Let nginx pick the Content-Type from the file extension
+        del resp.headers["Content-Type"]
+        return resp
+    # send_from_directory 404s on missing files itself. Under gunicorn the
+    # body goes through wsgi.file_wrapper, which uses sendfile(2).
     return send_from_directory(media_root, relpath, conditional=True)
 
 
-def _spa_index_path() -> Path | None:
-    static_app_dir = Path(current_app.static_folder) / "app"
-    index = static_app_dir / "index.html"
-    return index if index.exists() else None
+def _spa_index() -> tuple[bytes, str] | None:
+    """index.html content and its ETag, or None if the frontend isn't built.
 
+    Read once per app and kept in app.config, so SPA routes cost no file
+    system calls. In debug mode it is re-read on every request.
+    """
+    cached = current_app.config.get("SPA_INDEX")
+    if cached is not None and not current_app.debug:
+        return cached
+    index = Path(current_app.static_folder) / "app" / "index.html"
+    try:
+        content = index.read_bytes()
+    except OSError:
+        return None
+    cached = (content, hashlib.md5(content, usedforsecurity=False).hexdigest())
+    current_app.config["SPA_INDEX"] = cached
+    return cached
 
 
 @main.get("/")
 @main.get("/<path:path>")
 def spa(path: str = ""):
     """Serve SPA for all non-API routes."""
-    index = _spa_index_path()
+    index = _spa_index()
     if not index:
         return (
             "Frontend build missing. Build it via: cd frontend && npm install && npm run build, "
             "then copy dist to backend/app/static/app.",
             503,
         )
-    return send_from_directory(index.parent, "index.html")
+    content, etag = index
+    resp = current_app.response_class(content, mimetype="text/html")
+    resp.set_etag(etag)
+    # Always revalidate so a new frontend build is picked up (304 otherwise)
+    resp.cache_control.no_cache = True
+    return resp.make_conditional(request)
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional, see requirements.txt
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson.
+
+    Keys are sorted like the default provider so responses stay identical.
+    Types orjson does not handle natively go through DefaultJSONProvider.default.
+    """
+
+    option = 0 if orjson is None else orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Hand the bytes to the response directly (no str round-trip).
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.option), mimetype=self.mimetype
+        )
+
+
+def serializes_datetime(app: Flask) -> bool:
+    """True if app.json writes naive datetimes exactly like datetime.isoformat().
+
+    Views can then hand over datetime objects and skip formatting per row.
+    """
+    return isinstance(app.json, OrjsonProvider)
+
+
+def init_json(app: Flask) -> None:
+    """Use orjson for jsonify/request.get_json if it is installed."""
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
@@ -95,3 +95,5 @@ class BioEvent(db.Model):
 
 Index("ix_videos_uploaded_created", Video.uploaded, Video.created_at)
 Index("ix_photos_uploaded_created", Photo.uploaded, Photo.created_at)
+# Gallery filter (birds/nobirds) ordered by newest first
+Index("ix_videos_has_birds_created", Video.has_birds, Video.created_at)
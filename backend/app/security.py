@@ -23,6 +23,8 @@ from passlib.context import CryptContext
 pwd_context = CryptContext(
     schemes=["bcrypt_sha256", "bcrypt"],
     deprecated="auto",
+    # Pinned so the cost of new hashes doesn't change with the passlib version
+    bcrypt_sha256__rounds=12,
 )
 
 
@@ -31,5 +33,10 @@ def hash_password(password: str) -> str:
 
 
 def verify_password(password: str, password_hash: str) -> tuple[bool, str | None]:
-    ok, new_hash = pwd_context.verify_and_update(password, password_hash)
-    return bool(ok), new_hash
+    """Check a password; also return a new hash if the stored one is outdated."""
+    if not pwd_context.verify(password, password_hash):
+        return False, None
+    # Only re-hash (a second full bcrypt run) for legacy/outdated hashes
+    if pwd_context.needs_update(password_hash):
+        return True, pwd_context.hash(password)
+    return True, None
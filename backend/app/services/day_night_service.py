@@ -11,13 +11,19 @@ import subprocess
 import threading
 import time
 from dataclasses import dataclass
-from pathlib import Path
 from typing import Literal
 
 from flask import current_app
 
 logger = logging.getLogger(__name__)
 
+# (width, height) frames are downsampled to before measuring brightness
+BRIGHTNESS_SAMPLE_SIZE = (64, 36)
+# Frames per second the background grabber hands over for measuring
+GRABBER_FPS = 1
+# Grabbed readings older than this fall back to a one-shot ffmpeg sample
+GRABBER_MAX_AGE_S = 10.0
+
 
 @dataclass
 class DayNightStatus:
@@ -32,82 +38,51 @@ class DayNightService:
     """Service for automatic day/night mode switching based on brightness."""
 
     def __init__(self):
+        # Guards mode transitions and monitor start/stop, never held during ffmpeg
         self._lock = threading.Lock()
-        self._current_mode: Literal["DAY", "NIGHT"] = "DAY"
-        self._last_brightness = 50.0
-        self._last_check = 0.0
-        self._brightness_threshold = 30.0  # Default threshold
+        # (mode, brightness, last_check, threshold) in DayNightStatus field order.
+        # Replaced as a whole under _lock, read without it.
+        self._snapshot: tuple[Literal["DAY", "NIGHT"], float, float, float] = ("DAY", 50.0, 0.0, 30.0)
         self._check_interval = 60.0  # Check every 60 seconds
         self._monitor_thread = None
         self._running = False
+        self._app = None
+        # Long-lived ffmpeg decoding the shared UDP stream while monitoring
+        self._grabber: subprocess.Popen | None = None
+        # (brightness, timestamp) of the last grabbed frame
+        self._grabbed: tuple[float, float] | None = None
 
     def get_status(self) -> DayNightStatus:
         """Get current day/night status."""
-        with self._lock:
-            return DayNightStatus(
-                mode=self._current_mode,
-                brightness=self._last_brightness,
-                last_check=self._last_check,
-                threshold=self._brightness_threshold
-            )
-
-    def analyze_brightness(self, image_path: Path) -> float:
-        """Analyze brightness of an image using ffmpeg.
-
-        Args:
-            image_path: Path to the image file
+        return DayNightStatus(*self._snapshot)
+
+    @property
+    def is_monitoring(self) -> bool:
+        """True while automatic brightness monitoring runs."""
+        return self._running
+
+    def snapshot(self) -> dict:
+        """Current status as the API returns it (lower-case mode)."""
+        mode, brightness, last_check, threshold = self._snapshot
+        return {
+            "mode": mode.lower(),
+            "auto_enabled": self._running,
+            "brightness": brightness,
+            "last_check": last_check,
+            "threshold": threshold,
+        }
+
+    def _sample_brightness(self) -> float | None:
+        """Grab one downsampled grayscale frame and return its mean luminance.
+
+        A single ffmpeg call scales the frame to BRIGHTNESS_SAMPLE_SIZE and
+        writes raw 8-bit gray pixels to stdout, so nothing touches the disk.
 
         Returns:
-            Brightness value between 0 (dark) and 100 (bright)
-        """
-        try:
-            ffmpeg = current_app.config.get("FFMPEG_BIN", "ffmpeg")
-
-            # Use ffmpeg to analyze brightness
-            # We use the signalstats filter to get mean luminance
-            cmd = [
-                ffmpeg,
-                "-hide_banner",
-                "-i", str(image_path),
-                "-vf", "signalstats",
-                "-f", "null",
-                "-"
-            ]
-
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-
-            # Parse YAVG (average luminance) from output
-            # Format: [Parsed_signalstats_0 @ ...] YAVG:123.456
-            for line in result.stderr.split('\n'):
-                if 'YAVG:' in line:
-                    yavg_str = line.split('YAVG:')[1].split()[0]
-                    yavg = float(yavg_str)
-                    # Convert from 0-255 range to 0-100 percentage
-                    brightness = (yavg / 255.0) * 100.0
-                    return brightness
-
-            logger.warning(f"Could not parse brightness from ffmpeg output")
-            return 50.0  # Default to mid-range
-
-        except subprocess.TimeoutExpired:
-            logger.error("Brightness analysis timed out")
-            return self._last_brightness
-        except Exception as e:
-            logger.error(f"Error analyzing brightness: {e}")
-            return self._last_brightness
-
-    def capture_test_frame(self) -> Path | None:
-        """Capture a test frame for brightness analysis.
-
-        Returns:
-            Path to captured frame or None on error
+            Brightness value between 0 (dark) and 100 (bright), or None on error
         """
         try:
+            import numpy as np
             from ..models import Setting
 
             # Get video source configuration
@@ -121,13 +96,6 @@ class DayNightService:
                 logger.warning("VIDEO_SOURCE not configured")
                 return None
 
-            # Create temp directory for test frames
-            temp_dir = Path("/tmp/birdshome")
-            temp_dir.mkdir(parents=True, exist_ok=True)
-
-            output_path = temp_dir / "brightness_test.jpg"
-
-            # Capture single frame
             ffmpeg = current_app.config.get("FFMPEG_BIN", "ffmpeg")
             cmd = [
                 ffmpeg,
@@ -141,27 +109,29 @@ class DayNightService:
             else:
                 cmd.extend(["-i", video_source])
 
+            width, height = BRIGHTNESS_SAMPLE_SIZE
             cmd.extend([
                 "-frames:v", "1",
-                "-q:v", "2",
-                "-y",
-                str(output_path)
+                "-vf", f"scale={width}:{height}:flags=area,format=gray",
+                "-f", "rawvideo",
+                "pipe:1",
             ])
 
             result = subprocess.run(cmd, capture_output=True, timeout=15)
 
-            if result.returncode != 0:
-                logger.error(f"Failed to capture test frame: {result.stderr.decode()}")
+            if result.returncode != 0 or not result.stdout:
+                logger.error(f"Failed to capture test frame: {result.stderr.decode(errors='replace')}")
                 return None
 
-            if not output_path.exists():
-                logger.error("Test frame was not created")
-                return None
-
-            return output_path
+            pixels = np.frombuffer(result.stdout, dtype=np.uint8)
+            # Convert from 0-255 range to 0-100 percentage
+            return float(pixels.mean()) * 100.0 / 255.0
 
+        except subprocess.TimeoutExpired:
+            logger.error("Brightness sampling timed out")
+            return None
         except Exception as e:
-            logger.error(f"Error capturing test frame: {e}")
+            logger.error(f"Error sampling brightness: {e}")
             return None
 
     def check_and_update_mode(self) -> bool:
@@ -170,40 +140,114 @@ class DayNightService:
         Returns:
             True if mode was changed, False otherwise
         """
+        brightness = self._grabbed_brightness()
+        if brightness is None:
+            # Capture a frame and measure its brightness in one step (slow, unlocked)
+            brightness = self._sample_brightness()
+        if brightness is None:
+            logger.warning("Could not capture test frame for brightness check")
+            return False
+
         with self._lock:
-            # Capture test frame
-            test_frame = self.capture_test_frame()
-            if not test_frame:
-                logger.warning("Could not capture test frame for brightness check")
-                return False
-
-            # Analyze brightness
-            brightness = self.analyze_brightness(test_frame)
-            self._last_brightness = brightness
-            self._last_check = time.time()
-
-            # Clean up test frame
-            try:
-                test_frame.unlink()
-            except:
-                pass
+            old_mode, _, _, threshold = self._snapshot
+            mode = old_mode
 
             # Determine mode based on brightness with hysteresis
             # Use hysteresis to avoid flickering:
             # - Switch to NIGHT when brightness < threshold
             # - Switch to DAY when brightness > threshold + 10
-            old_mode = self._current_mode
-
-            if self._current_mode == "DAY":
-                if brightness < self._brightness_threshold:
-                    self._current_mode = "NIGHT"
+            if old_mode == "DAY":
+                if brightness < threshold:
+                    mode = "NIGHT"
                     logger.info(f"Switching to NIGHT mode (brightness: {brightness:.1f})")
             else:  # NIGHT
-                if brightness > self._brightness_threshold + 10:
-                    self._current_mode = "DAY"
+                if brightness > threshold + 10:
+                    mode = "DAY"
                     logger.info(f"Switching to DAY mode (brightness: {brightness:.1f})")
 
-            return old_mode != self._current_mode
+            self._snapshot = (mode, brightness, time.time(), threshold)
+            return old_mode != mode
+
+    def _grabbed_brightness(self) -> float | None:
+        """Brightness of the grabber's latest frame, or None if there is no recent one."""
+        grabbed = self._grabbed
+        if grabbed is None or time.time() - grabbed[1] > GRABBER_MAX_AGE_S:
+            return None
+        return grabbed[0]
+
+    def _ensure_grabber(self):
+        """(Re)start the background ffmpeg grabber if it isn't running.
+
+        It reads the UDP stream the stream service publishes (like motion
+        detection and timelapse do), so the camera itself stays free.
+        """
+        if not self._running or (self._grabber is not None and self._grabber.poll() is None):
+            return
+
+        from .. import constants as C
+        from ..models import Setting
+
+        udp_setting = Setting.query.filter_by(key=C.STREAM_UDP_URL).first()
+        udp_url = udp_setting.value if udp_setting else current_app.config.get(C.STREAM_UDP_URL)
+        if not udp_url:
+            return
+
+        width, height = BRIGHTNESS_SAMPLE_SIZE
+        cmd = [
+            current_app.config.get("FFMPEG_BIN", "ffmpeg"),
+            "-hide_banner",
+            "-loglevel", "error",
+            "-i", udp_url,
+            "-vf", f"fps={GRABBER_FPS},scale={width}:{height}:flags=area,format=gray",
+            "-f", "rawvideo",
+            "pipe:1",
+        ]
+        try:
+            self._grabber = subprocess.Popen(
+                cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=0
+            )
+        except OSError as e:
+            logger.error(f"Could not start brightness grabber: {e}")
+            self._grabber = None
+            return
+
+        threading.Thread(
+            target=self._read_grabber,
+            args=(self._grabber,),
+            daemon=True,
+            name="DayNightGrabber"
+        ).start()
+        logger.info(f"Started brightness grabber on {udp_url}")
+
+    def _read_grabber(self, proc: subprocess.Popen):
+        """Read gray frames from the grabber and keep the latest brightness."""
+        import numpy as np
+
+        width, height = BRIGHTNESS_SAMPLE_SIZE
+        frame = bytearray(width * height)
+        view = memoryview(frame)
+        pixels = np.frombuffer(frame, dtype=np.uint8)
+
+        while True:
+            filled = 0
+            while filled < len(frame):
+                n = proc.stdout.readinto(view[filled:])
+                if not n:
+                    logger.info("Brightness grabber exited")
+                    return
+                filled += n
+            self._grabbed = (float(pixels.mean()) * 100.0 / 255.0, time.time())
+
+    def _stop_grabber(self):
+        proc, self._grabber = self._grabber, None
+        self._grabbed = None
+        if proc is None:
+            return
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
 
     def _monitor_loop(self):
         """Background thread that periodically checks brightness and updates mode."""
@@ -211,14 +255,18 @@ class DayNightService:
 
         while self._running:
             try:
-                if self.check_and_update_mode():
+                with self._app.app_context():
+                    self._ensure_grabber()
+                    mode_changed = self.check_and_update_mode()
+                if mode_changed:
                     # Mode changed - restart UDP source stream with new settings
                     try:
                         from .stream_service import stream_service
                         logger.info("Restarting UDP source stream with new day/night mode settings")
                         # Restart only the UDP source, not the entire stream service
                         # This ensures motion detection and other services continue working
-                        stream_service.restart_udp_source()
+                        with self._app.app_context():
+                            stream_service.restart_udp_source()
                     except Exception as e:
                         logger.error(f"Error restarting UDP source after mode change: {e}")
 
@@ -242,9 +290,12 @@ class DayNightService:
                 logger.warning("Day/Night monitoring already running")
                 return
 
-            self._brightness_threshold = threshold
+            mode, brightness, last_check, _ = self._snapshot
+            self._snapshot = (mode, brightness, last_check, threshold)
             self._check_interval = interval
             self._running = True
+            # Threads don't inherit the app context; the loop pushes its own
+            self._app = current_app._get_current_object()
 
             self._monitor_thread = threading.Thread(
                 target=self._monitor_loop,
@@ -266,11 +317,11 @@ class DayNightService:
         # Wait for thread to finish
         if self._monitor_thread:
             self._monitor_thread.join(timeout=5)
+        self._stop_grabber()
 
     def get_mode(self) -> Literal["DAY", "NIGHT"]:
         """Get current mode."""
-        with self._lock:
-            return self._current_mode
+        return self._snapshot[0]
 
     def set_mode(self, mode: Literal["DAY", "NIGHT"]):
         """Manually set day/night mode.
@@ -278,12 +329,12 @@ class DayNightService:
         Args:
             mode: Mode to set ("DAY" or "NIGHT")
         """
-        with self._lock:
-            if mode not in ("DAY", "NIGHT"):
-                raise ValueError(f"Invalid mode: {mode}. Must be 'DAY' or 'NIGHT'")
+        if mode not in ("DAY", "NIGHT"):
+            raise ValueError(f"Invalid mode: {mode}. Must be 'DAY' or 'NIGHT'")
 
-            old_mode = self._current_mode
-            self._current_mode = mode
+        with self._lock:
+            old_mode, brightness, last_check, threshold = self._snapshot
+            self._snapshot = (mode, brightness, last_check, threshold)
 
             if old_mode != mode:
                 logger.info(f"Manually switched from {old_mode} to {mode} mode")
@@ -3,14 +3,31 @@ from __future__ import annotations
 import os
 import shutil
 import subprocess
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 
+import requests
 from flask import current_app
 
-
 from ..models import Setting
 
+# Seconds HiDrive settings are reused across checks and dashboard polls
+HIDRIVE_CONFIG_TTL = 5.0
+# Seconds systemd timer states are reused across checks and polls
+TIMER_STATE_TTL = 5.0
+# Seconds the free space on / is reused; it changes slowly compared to polling
+DISK_FREE_TTL = 10.0
+# Upper bound for reusing the arecord listing while /proc/asound/cards is unchanged
+MIC_CHECK_TTL = 60.0
+ASOUND_CARDS = "/proc/asound/cards"
+_HIDRIVE_KEYS = ("HIDRIVE_USER", "HIDRIVE_PASSWORD", "HIDRIVE_TARGET_DIR")
+HIDRIVE_WEBDAV_URL = "https://webdav.hidrive.strato.com"
+# Keep-alive connections to HiDrive, reused across checks and polls
+_hidrive_session = requests.Session()
+
 
 @dataclass
 class CheckResult:
@@ -20,51 +37,126 @@ class CheckResult:
     duration_ms: int
 
 
-def _run_cmd(cmd: list[str], timeout_s: int = 10) -> tuple[int, str, str]:
-    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+def _run_cmd(cmd: list[str], timeout_s: int = 10, *, capture: bool = True) -> tuple[int, bytes, bytes]:
+    """Run a command and return (returncode, stdout, stderr) as raw bytes.
+
+    With capture=False the output is discarded (no pipes) and only the
+    return code is meaningful. A timeout returns 124 like coreutils timeout.
+    """
+    sink = subprocess.PIPE if capture else subprocess.DEVNULL
+    # Keep to plain arguments (no preexec_fn, cwd, env, start_new_session):
+    # CPython then spawns via vfork on Linux, which doesn't copy the page
+    # tables of the Flask worker. posix_spawn (_USE_POSIX_SPAWN) would also
+    # need close_fds=False, which isn't worth leaking fds into the child for.
     try:
-        out, err = proc.communicate(timeout=timeout_s)
+        result = subprocess.run(cmd, stdin=subprocess.DEVNULL, stdout=sink, stderr=sink, timeout=timeout_s)
     except subprocess.TimeoutExpired:
-        proc.kill()
-        out, err = proc.communicate()
-        return 124, out, "timeout"
-    return proc.returncode, out, err
+        return 124, b"", b"timeout"
+    return result.returncode, result.stdout or b"", result.stderr or b""
 
 
-class HealthcheckService:
-    def run(self) -> list[CheckResult]:
-        results: list[CheckResult] = []
+@lru_cache(maxsize=4)
+def _ffmpeg_present(path: str) -> bool:
+    """True if the ffmpeg binary resolves; it doesn't change between deploys."""
+    return shutil.which(path) is not None
 
-        def timed(name: str, fn):
-            t0 = time.time()
-            try:
+
+def _excerpt(*outputs: bytes, default: str) -> str:
+    """First non-empty output, decoded and cut to the 200 chars shown in the UI."""
+    for data in outputs:
+        if data:
+            return data[:800].decode(errors="replace").strip()[:200]
+    return default
+
+
+class HealthcheckService:
+    def __init__(self) -> None:
+        # (monotonic time, config) of the last HiDrive settings read
+        self._hidrive_config: tuple[float, dict] | None = None
+        # (monotonic time, states) of the last systemd timer query
+        self._timer_cache: tuple[float, dict] | None = None
+        # (monotonic time, free bytes on /) of the last statvfs
+        self._disk_free: tuple[float, int] | None = None
+        # (cards mtime_ns, monotonic time, result) of the last arecord -l
+        self._mic_cache: tuple[int | None, float, tuple[bool, str]] | None = None
+        # (monotonic time, results) of the last full run
+        self._last_run: tuple[float, list[CheckResult]] | None = None
+        # Concurrent callers wait for the run in progress instead of starting another
+        self._run_lock = threading.Lock()
+
+    def run(self, force: bool = False) -> list[CheckResult]:
+        """Results of all checks, reused for HEALTHCHECK_CACHE_TTL seconds.
+
+        Args:
+            force: Run the checks even if cached results are still fresh
+        """
+        ttl = current_app.config.get("HEALTHCHECK_CACHE_TTL", 5.0)
+        with self._run_lock:
+            cached = self._last_run
+            if not force and cached is not None and time.monotonic() - cached[0] < ttl:
+                return cached[1]
+            results = self._run_checks()
+            self._last_run = (time.monotonic(), results)
+            return results
+
+    def _run_checks(self) -> list[CheckResult]:
+        """Run all checks concurrently; results keep the order below.
+
+        Most checks wait on subprocesses or the network (HiDrive), so the
+        total time is that of the slowest check rather than the sum.
+        """
+        checks = [
+            ("HiDrive Connection", self._hidrive_list),
+            ("HiDrive Test Upload", self._hidrive_test_upload),
+            ("Camera Availability", self._camera),
+            ("Microphone Availability", self._mic),
+            ("Disk Space", self._disk),
+            ("Scheduler Status", self._scheduler),
+            ("Streaming Pipeline", self._streaming),
+            ("Motion Service", self._motion_service),
+            ("Snapshot Service", self._snapshot_service),
+            ("Systemd Timers", self._timers),
+        ]
+        app = current_app._get_current_object()
+        # Load once here so both HiDrive checks and both timer checks hit the cache
+        self._get_hidrive_config()
+        self._timer_states()
+
+        with ThreadPoolExecutor(max_workers=len(checks), thread_name_prefix="healthcheck") as pool:
+            futures = [pool.submit(self._timed_wrap, app, name, fn) for name, fn in checks]
+            # Collected in submission order (not as_completed) so the UI list is stable
+            return [f.result() for f in futures]
+
+    def _timed_wrap(self, app, name: str, fn) -> CheckResult:
+        """Run one check in a worker thread and time it."""
+        t0 = time.time()
+        try:
+            # Checks read config and settings, which need an app context per thread
+            with app.app_context():
                 ok, details = fn()
-            except Exception as e:  # noqa: BLE001
-                ok, details = False, str(e)
-            dt = int((time.time() - t0) * 1000)
-            results.append(CheckResult(name=name, ok=ok, details=details, duration_ms=dt))
-
-        timed("HiDrive Connection", self._hidrive_list)
-        timed("HiDrive Test Upload", self._hidrive_test_upload)
-        timed("Camera Availability", self._camera)
-        timed("Microphone Availability", self._mic)
-        timed("Disk Space", self._disk)
-        timed("Scheduler Status", self._scheduler)
-        timed("Streaming Pipeline", self._streaming)
-        timed("Motion Service", self._motion_service)
-        timed("Snapshot Service", self._snapshot_service)
-        timed("Systemd Timers", self._timers)
-
-        return results
+        except Exception as e:  # noqa: BLE001
+            ok, details = False, str(e)
+        dt = int((time.time() - t0) * 1000)
+        return CheckResult(name=name, ok=ok, details=details, duration_ms=dt)
 
     def _get_hidrive_config(self):
-        """Load HiDrive configuration from database."""
-        settings = {s.key: s.value for s in Setting.query.all()}
-        return {
+        """Load HiDrive configuration from database (cached for HIDRIVE_CONFIG_TTL)."""
+        cached = self._hidrive_config
+        if cached is not None and time.monotonic() - cached[0] < HIDRIVE_CONFIG_TTL:
+            return cached[1]
+
+        settings = dict(
+            Setting.query.with_entities(Setting.key, Setting.value)
+            .filter(Setting.key.in_(_HIDRIVE_KEYS))
+            .all()
+        )
+        config = {
             "user": settings.get("HIDRIVE_USER", ""),
             "password": settings.get("HIDRIVE_PASSWORD", ""),
             "target_dir": settings.get("HIDRIVE_TARGET_DIR", "Birdshome"),
         }
+        self._hidrive_config = (time.monotonic(), config)
+        return config
 
     def _hidrive_list(self):
         config = self._get_hidrive_config()
@@ -75,19 +167,22 @@ class HealthcheckService:
 
         if not config["target_dir"]:
             return False, "HiDrive target directory not configured (HIDRIVE_TARGET_DIR)."
-        import socket
-        hostname = socket.gethostname()
-        # Test connection using curl to WebDAV
-        webdav_url = f"https://webdav.hidrive.strato.com/{config['user']}/{config['target_dir']}/{'hostname'}/"
-        rc, out, err = _run_cmd([
-            "curl", "-s", "-u", f"{config['user']}:{config['password']}",
-            "-X", "PROPFIND", webdav_url
-        ], timeout_s=8)
-
-        if rc == 0:
-            return True, "Connected."
-        else:
-            return False, (err or out or "Connection failed").strip()[:200]
+        # A HEAD on the user root is enough to prove TLS and credentials; the
+        # device directory is created by the first upload anyway.
+        webdav_url = f"{HIDRIVE_WEBDAV_URL}/{config['user']}/"
+        try:
+            resp = _hidrive_session.head(webdav_url, auth=(config["user"], config["password"]), timeout=5)
+        except requests.RequestException as e:
+            return False, str(e)[:200]
+
+        if resp.status_code in (401, 403):
+            return False, f"Authentication failed (HTTP {resp.status_code})."
+        if resp.status_code == 404:
+            return False, "HiDrive user directory not found (HTTP 404); check HIDRIVE_USER."
+        # 405: credentials accepted, but HEAD isn't allowed on the collection
+        if not (200 <= resp.status_code < 300 or resp.status_code == 405):
+            return False, f"HTTP {resp.status_code}"
+        return True, "Connected."
 
     def _hidrive_test_upload(self):
         config = self._get_hidrive_config()
@@ -96,45 +191,52 @@ class HealthcheckService:
         if not config["user"] or not config["password"]:
             return False, "HiDrive credentials not configured."
 
-        tmp_path = "/tmp/birdshome_healthcheck.txt"
-        with open(tmp_path, "w", encoding="utf-8") as f:
-            f.write("birdshome healthcheck\n")
-
-        # Upload test file using curl
-        webdav_url = f"https://webdav.hidrive.strato.com/{config['target_dir']}/healthcheck.txt"
-        rc, out, err = _run_cmd([
-            "curl", "-s", "-u", f"{config['user']}:{config['password']}",
-            "-T", tmp_path, webdav_url
-        ], timeout_s=15)
-
-        if rc != 0:
-            return False, (err or out or "upload failed").strip()[:200]
-
-        # Delete test file
-        _run_cmd([
-            "curl", "-s", "-u", f"{config['user']}:{config['password']}",
-            "-X", "DELETE", webdav_url
-        ], timeout_s=10)
+        auth = (config["user"], config["password"])
+        webdav_url = f"{HIDRIVE_WEBDAV_URL}/{config['target_dir']}/healthcheck.txt"
+        try:
+            resp = _hidrive_session.put(webdav_url, data=b"birdshome healthcheck\n", auth=auth, timeout=15)
+            if resp.status_code >= 400:
+                return False, f"Upload failed (HTTP {resp.status_code})."
+            # Delete test file
+            _hidrive_session.delete(webdav_url, auth=auth, timeout=10)
+        except requests.RequestException as e:
+            return False, str(e)[:200]
 
         return True, "Uploaded and cleaned up."
 
     def _camera(self):
         # Baseline: verify ffmpeg exists and video source string is configured.
         ffmpeg = current_app.config.get("FFMPEG_BIN", "ffmpeg")
-        rc, out, err = _run_cmd([ffmpeg, "-version"], timeout_s=5)
-        if rc != 0:
+        if not _ffmpeg_present(ffmpeg):
             return False, "ffmpeg not available"
         return True, "ffmpeg available; camera source configured."
 
     def _mic(self):
-        # Baseline: check arecord listing
+        # Baseline: check arecord listing, re-run only when the ALSA card list changes
+        try:
+            cards_mtime = os.stat(ASOUND_CARDS).st_mtime_ns
+        except OSError:
+            cards_mtime = None
+        cached = self._mic_cache
+        if cached is not None and cached[0] == cards_mtime and time.monotonic() - cached[1] < MIC_CHECK_TTL:
+            return cached[2]
+
         rc, out, err = _run_cmd(["arecord", "-l"], timeout_s=5)
         if rc != 0:
-            return False, (err or out or "arecord not available").strip()[:200]
-        return True, "ALSA devices listed."
+            result = False, _excerpt(err, out, default="arecord not available")
+        else:
+            result = True, "ALSA devices listed."
+        self._mic_cache = (cards_mtime, time.monotonic(), result)
+        return result
 
     def _disk(self):
-        total, used, free = shutil.disk_usage("/")
+        cached = self._disk_free
+        if cached is not None and time.monotonic() - cached[0] < DISK_FREE_TTL:
+            free = cached[1]
+        else:
+            st = os.statvfs("/")
+            free = st.f_bavail * st.f_frsize
+            self._disk_free = (time.monotonic(), free)
         free_gb = free / (1024**3)
         if free_gb < 1.0:
             return False, f"Low disk space: {free_gb:.2f}GB free"
@@ -149,9 +251,11 @@ class HealthcheckService:
         if mode == "HLS":
             hls_dir = os.path.join(current_app.static_folder, "hls")
             m3u8 = os.path.join(hls_dir, "index.m3u8")
-            if not os.path.exists(m3u8):
+            try:
+                st = os.stat(m3u8)
+            except FileNotFoundError:
                 return False, "No HLS playlist found. Start stream first."
-            age_s = time.time() - os.path.getmtime(m3u8)
+            age_s = time.time() - st.st_mtime
             if age_s > 30:
                 return False, f"HLS playlist stale ({age_s:.0f}s)."
             return True, "HLS playlist is fresh."
@@ -183,40 +287,42 @@ class HealthcheckService:
 
         return True, details
 
+    def _timer_states(self) -> dict[str, dict]:
+        """LoadState/ActiveState/next run of all birdshome timers (cached for TIMER_STATE_TTL).
+
+        One systemd query serves both timer checks.
+        """
+        cached = self._timer_cache
+        if cached is not None and time.monotonic() - cached[0] < TIMER_STATE_TTL:
+            return cached[1]
+
+        from .systemd_utils import BIRDSHOME_TIMERS, units_properties
+
+        states = units_properties(BIRDSHOME_TIMERS, "LoadState", "ActiveState", "NextElapseUSecRealtime")
+        self._timer_cache = (time.monotonic(), states)
+        return states
+
     def _snapshot_service(self):
         """Check snapshot service status via systemd."""
-        try:
-            rc, out, err = _run_cmd([
-                "systemctl", "show", "birdshome-snapshot.timer",
-                "--property=ActiveState,NextElapseUSecRealtime"
-            ], timeout_s=5)
+        from .systemd_utils import usec_to_timestamp
 
-            if rc != 0:
+        try:
+            props = self._timer_states().get("birdshome-snapshot.timer")
+            if not props or props.get("LoadState") != "loaded":
                 return False, "Snapshot timer not found or not active"
 
-            active = False
-            next_run = None
-            for line in out.strip().split('\n'):
-                if line.startswith("ActiveState="):
-                    active = "active" in line.lower()
-                elif line.startswith("NextElapseUSecRealtime="):
-                    usec_str = line.split("=", 1)[1].strip()
-                    if usec_str and usec_str != "0":
-                        try:
-                            usec = int(usec_str)
-                            from datetime import datetime
-                            next_time = datetime.fromtimestamp(usec / 1_000_000)
-                            delta = (next_time - datetime.now()).total_seconds()
-                            if delta < 60:
-                                next_run = f"next run in {int(delta)}s"
-                            else:
-                                next_run = f"next run in {int(delta // 60)}m"
-                        except (ValueError, OSError):
-                            pass
-
-            if not active:
+            if props.get("ActiveState") != "active":
                 return False, "Snapshot timer inactive"
 
+            next_run = None
+            next_ts = usec_to_timestamp(props.get("NextElapseUSecRealtime"))
+            if next_ts:
+                delta = next_ts - time.time()
+                if delta < 60:
+                    next_run = f"next run in {int(delta)}s"
+                else:
+                    next_run = f"next run in {int(delta // 60)}m"
+
             return True, next_run or "Timer active"
         except Exception as e:
             return False, f"Error checking snapshot service: {str(e)[:100]}"
@@ -224,25 +330,16 @@ class HealthcheckService:
     def _timers(self):
         """Check all birdshome systemd timers."""
         try:
-            rc, out, err = _run_cmd([
-                "systemctl", "list-timers", "--no-pager", "--no-legend", "birdshome-*"
-            ], timeout_s=5)
-
-            if rc != 0:
-                return False, "Could not list timers"
-
-            lines = [line.strip() for line in out.strip().split('\n') if line.strip()]
-            if not lines:
+            states = self._timer_states()
+            loaded = {name: props for name, props in states.items() if props.get("LoadState") == "loaded"}
+            if not loaded:
                 return False, "No birdshome timers found"
 
-            active_timers = []
-            for line in lines:
-                parts = line.split()
-                if len(parts) >= 6:
-                    timer_name = parts[-1] if parts[-1].endswith('.timer') else None
-                    if timer_name:
-                        active_timers.append(timer_name.replace('birdshome-', '').replace('.timer', ''))
-
+            active_timers = [
+                name.replace('birdshome-', '').replace('.timer', '')
+                for name, props in loaded.items()
+                if props.get("ActiveState") == "active"
+            ]
             if not active_timers:
                 return False, "No active timers"
 
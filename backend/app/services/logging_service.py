@@ -1,11 +1,32 @@
 from __future__ import annotations
 
+import atexit
 import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # optional, see requirements.txt
+    orjson = None
+
+# Background listener that performs the actual file/console writes for the app logger.
+_listener: QueueListener | None = None
+
+
+def _stop_listener() -> None:
+    """Flush and stop the queue listener (safe to call repeatedly)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(_stop_listener)
+
 
 def configure_logging(app, service_name: str = "birdshome") -> None:
     """Configure app logger with file and console handlers.
@@ -17,9 +38,12 @@ def configure_logging(app, service_name: str = "birdshome") -> None:
     Logs to:
     - Console (stderr)
     - /var/log/birdshome/<service_name>.log with rotation
+
+    Request threads only enqueue records; a QueueListener thread writes them.
     """
-    log_enabled = str(app.config.get("LOG_ENABLED", "1")) not in {"0", "false", "False"}
-    level = str(app.config.get("LOG_LEVEL", "INFO")).upper()
+    global _listener
+    log_enabled = str(app.config.get("LOG_ENABLED", app.config.get("LOG_ENABLED_DEFAULT", "1"))) not in {"0", "false", "False"}
+    level = str(app.config.get("LOG_LEVEL", app.config.get("LOG_LEVEL_DEFAULT", "INFO"))).upper()
 
     # Keep Flask's default handlers if logging disabled.
     if not log_enabled:
@@ -44,9 +68,28 @@ def configure_logging(app, service_name: str = "birdshome") -> None:
 
     app.logger.setLevel(level)
 
+    # app.logger is process-wide (one per app name): a second create_app() or
+    # a reloader pass with the same settings keeps the running setup.
+    signature = (level, str(log_file), max_bytes, backup_count)
+    if _listener is not None and getattr(app.logger, "_birdshome_configured", None) == signature:
+        return
+
+    # Keep the open log file if it stays the same; only level/rotation may change.
+    previous = _listener.handlers if _listener is not None else ()
+    file_handler = next(
+        (h for h in previous if isinstance(h, RotatingFileHandler) and h.baseFilename == os.path.abspath(log_file)),
+        None,
+    )
+
     # Avoid duplicate handlers on reload.
     for h in list(app.logger.handlers):
         app.logger.removeHandler(h)
+    _stop_listener()
+    for h in previous:
+        if h is not file_handler and isinstance(h, logging.FileHandler):
+            h.close()
+
+    handlers: list[logging.Handler] = []
 
     formatter = logging.Formatter(
         fmt="%(asctime)s %(levelname)-8s [%(name)s] %(message)s",
@@ -55,14 +98,18 @@ def configure_logging(app, service_name: str = "birdshome") -> None:
 
     # File handler with rotation
     try:
-        file_handler = RotatingFileHandler(
-            str(log_file),
-            maxBytes=max_bytes,
-            backupCount=backup_count,
-        )
+        if file_handler is None:
+            file_handler = RotatingFileHandler(
+                str(log_file),
+                maxBytes=max_bytes,
+                backupCount=backup_count,
+            )
+        else:
+            file_handler.maxBytes = max_bytes
+            file_handler.backupCount = backup_count
         file_handler.setFormatter(formatter)
         file_handler.setLevel(level)
-        app.logger.addHandler(file_handler)
+        handlers.append(file_handler)
     except (OSError, PermissionError) as e:
         app.logger.error(f"Could not create log file {log_file}: {e}")
 
@@ -70,7 +117,14 @@ def configure_logging(app, service_name: str = "birdshome") -> None:
     stream_handler = logging.StreamHandler()
     stream_handler.setFormatter(formatter)
     stream_handler.setLevel(level)
-    app.logger.addHandler(stream_handler)
+    handlers.append(stream_handler)
+
+    # SimpleQueue: unbounded, C-implemented put() without a Python-level lock
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    app.logger.addHandler(QueueHandler(log_queue))
+    app.logger._birdshome_configured = signature
 
     app.logger.info(f"Logging configured: level={level}, file={log_file}")
 
@@ -132,7 +186,17 @@ def setup_service_logger(name: str, log_dir: str = "/var/log/birdshome", level:
     return logger
 
 
+# Compact metric JSON; the stdlib encoder is built once instead of per json.dumps() call
+if orjson is not None:
+    def _metric_dumps(payload: dict) -> str:
+        return orjson.dumps(payload).decode()
+else:
+    _metric_dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
 def log_metric(logger, name: str, **fields):
     """Structured metric-style log line."""
-    payload = {"metric": name, **fields}
-    logger.info(json.dumps(payload, ensure_ascii=False))
+    # Skip the JSON encoding entirely when INFO is filtered out
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    logger.info(_metric_dumps({"metric": name, **fields}))
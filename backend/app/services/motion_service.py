@@ -7,20 +7,171 @@ video clips when motion is detected.
 from __future__ import annotations
 
 import logging
+import math
+import os
+import queue
+import signal
 import subprocess
 import time
+from collections import deque
+from collections.abc import Sequence
 from datetime import datetime
 from pathlib import Path
 from threading import Thread, Event, Lock
-import cv2
+
 from flask import current_app
 
+from ..config import _truthy
 from ..extensions import db
 from ..models import Video
 from .video_utils import get_rotation_filter, apply_video_filters
 
 logger = logging.getLogger(__name__)
 
+# (width, height) frames are downsampled to before diffing
+MOTION_SAMPLE_SIZE = (160, 90)
+# Frames per second ffmpeg hands to the detection loop
+MOTION_FPS = 3
+# Changed sample pixels that count as motion: the former 35 px minimum area
+# at the default 640x480 stream resolution, scaled to MOTION_SAMPLE_SIZE.
+# Each sample pixel averages a block of the frame, so single-pixel sensor
+# noise doesn't reach the threshold on its own.
+MOTION_MIN_PIXELS = math.ceil(35 * (MOTION_SAMPLE_SIZE[0] * MOTION_SAMPLE_SIZE[1]) / (640 * 480))
+# ffmpeg video codec arguments per VIDEO_ENCODER setting. "copy" keeps the
+# H.264 of the UDP stream; the others re-encode, preferably in hardware
+# (h264_v4l2m2m on the Pi, h264_nvenc on NVIDIA).
+_ENCODER_ARGS = {
+    "copy": ["-c:v", "copy"],
+    "h264_v4l2m2m": ["-c:v", "h264_v4l2m2m", "-b:v", "4M", "-pix_fmt", "yuv420p"],
+    "h264_nvenc": ["-c:v", "h264_nvenc", "-preset", "p4", "-tune", "ll", "-rc", "vbr", "-cq", "23"],
+    "libx264": ["-c:v", "libx264", "-preset", "fast", "-crf", "23", "-pix_fmt", "yuv420p"],
+}
+# JPEG quality of motion and debug snapshots
+SNAPSHOT_JPEG_QUALITY = 85
+# systemd unit running scripts/run-motion.py
+MOTION_UNIT = "birdshome-motion.service"
+# Settings keys _load_config reads from the database
+MOTION_SETTING_KEYS = frozenset({
+    "VIDEO_SOURCE", "AUDIO_SOURCE", "MOTION_SOURCE", "STREAM_UDP_URL",
+    "RECORD_FPS", "RECORD_RES", "VIDEO_ROTATION", "VIDEO_ENCODER", "PREFIX",
+    "MOTION_THRESHOLD", "MOTION_DURATION_S", "MOTION_COOLDOWN_S",
+    "MOTION_SENSOR_GPIO", "MOTION_SENSOR_ENABLED", "MOTION_FRAMEDIFF_ENABLED",
+})
+# ffmpeg stderr lines kept for the error message of a failed recording
+STDERR_TAIL_LINES = 20
+
+
+def _build_record_cmd(
+    source: str,
+    output: Path,
+    duration: int,
+    audio: bool,
+    video_args: Sequence[str] = _ENCODER_ARGS["copy"],
+    input_args: Sequence[str] = (),
+) -> list[str]:
+    """ffmpeg command recording duration seconds of source to output.
+
+    Args:
+        source: Input URL (the UDP stream)
+        output: Target .mp4 path
+        duration: Clip length in seconds
+        audio: Copy the audio track (otherwise it is dropped)
+        video_args: Video codec/filter arguments, stream copy by default
+        input_args: Extra arguments placed before -i (e.g. hwaccel)
+    """
+    # Robust UDP options: regenerate timestamps and skip corrupt packets
+    return [
+        "ffmpeg",
+        "-hide_banner",
+        "-loglevel", "error",
+        "-fflags", "+genpts+discardcorrupt+igndts",
+        "-flags", "low_delay",
+        "-strict", "experimental",
+        "-analyzeduration", "5000000",
+        "-probesize", "10000000",
+        *input_args,
+        "-i", source,
+        "-t", str(duration),
+        *video_args,
+        *(["-c:a", "copy"] if audio else ["-an"]),
+        "-movflags", "+faststart",
+        "-avoid_negative_ts", "make_zero",
+        "-y", str(output),
+    ]
+
+
+def _run_ffmpeg(cmd: list[str], timeout_s: float) -> tuple[int, str]:
+    """Run ffmpeg, logging its stderr as it arrives.
+
+    Only the last STDERR_TAIL_LINES lines are kept for the caller, so a
+    chatty log level can't pile up in memory. On timeout the process is
+    terminated (then killed) and TimeoutExpired is re-raised.
+
+    Returns:
+        (returncode, last stderr lines joined by newlines)
+    """
+    proc = subprocess.Popen(
+        cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, bufsize=1
+    )
+    tail: deque[str] = deque(maxlen=STDERR_TAIL_LINES)
+
+    def drain():
+        for line in proc.stderr:
+            line = line.rstrip()
+            if line:
+                logger.warning(f"ffmpeg: {line}")
+                tail.append(line)
+
+    reader = Thread(target=drain, daemon=True, name="MotionFfmpegStderr")
+    reader.start()
+    try:
+        proc.wait(timeout=timeout_s)
+    except subprocess.TimeoutExpired:
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        raise
+    finally:
+        reader.join(timeout=1)
+    return proc.returncode, "\n".join(tail)
+
+
+def _probe_video(path: Path, duration: int, resolution: str) -> tuple[int | None, str]:
+    """Read (duration, "WxH") of a recorded clip with ffprobe.
+
+    Falls back to the given values if ffprobe fails.
+    """
+    try:
+        probe_cmd = [
+            "ffprobe",
+            "-v", "error",
+            "-show_entries", "format=duration:stream=width,height",
+            "-of", "default=noprint_wrappers=1",
+            str(path)
+        ]
+        probe_result = subprocess.run(probe_cmd, capture_output=True, text=True, timeout=5)
+
+        actual_duration = None
+        actual_width = None
+        actual_height = None
+
+        for line in probe_result.stdout.strip().split('\n'):
+            if line.startswith("duration="):
+                actual_duration = int(float(line.split('=')[1]))
+            elif line.startswith("width="):
+                actual_width = int(line.split('=')[1])
+            elif line.startswith("height="):
+                actual_height = int(line.split('=')[1])
+
+        actual_resolution = f"{actual_width}x{actual_height}" if actual_width and actual_height else resolution
+        return actual_duration, actual_resolution
+
+    except Exception:
+        return duration, resolution
+
 
 class MotionDetectionService:
     """Service for detecting motion and recording video clips.
@@ -35,25 +186,42 @@ class MotionDetectionService:
     def __init__(self):
         self.running = False
         self.stop_event = Event()
-        self.recording_lock = False
         self.last_motion_time = 0
         self.config = {}
         self.app = None
         self.recording_guard = Lock()
         self.gpio_available = False
         self.gpio_thread = None
-
-    def _load_config(self) -> None:
-        """Load config from database settings into thread-safe dict."""
+        # Set when settings were saved; the detection loop reloads its config
+        self._config_dirty = Event()
+        # ffmpeg feeding gray sample frames to the detection loop
+        self._sampler: subprocess.Popen | None = None
+        # <MEDIA_ROOT>/motion, set by start()
+        self._motion_dir: Path | None = None
+        # (frame, path) pairs for the snapshot writer thread, so JPEG encoding
+        # and disk writes don't stall the detection loop
+        self._snapshots: queue.Queue = queue.Queue(maxsize=2)
+        self._snapshot_thread: Thread | None = None
+
+    def _load_config(self) -> bool:
+        """Load config from database settings into thread-safe dict.
+
+        The dict is replaced as a whole, so readers never see a partial update.
+
+        Returns:
+            True if the config changed
+        """
         from ..models import Setting
 
-        # Load settings from database
-        settings = {}
-        for setting in Setting.query.all():
-            settings[setting.key] = setting.value
+        # Load only the settings used here, as (key, value) rows
+        settings = dict(
+            Setting.query.with_entities(Setting.key, Setting.value)
+            .filter(Setting.key.in_(list(MOTION_SETTING_KEYS)))
+            .all()
+        )
 
         # Build config dict with database values, fallback to app config
-        self.config = {
+        config = {
             "VIDEO_SOURCE": settings.get("VIDEO_SOURCE") or current_app.config.get("VIDEO_SOURCE"),
             "AUDIO_SOURCE": settings.get("AUDIO_SOURCE") or current_app.config.get("AUDIO_SOURCE", ""),
             "MOTION_SOURCE": settings.get("MOTION_SOURCE") or current_app.config.get("MOTION_SOURCE", ""),
@@ -68,28 +236,63 @@ class MotionDetectionService:
             "MOTION_SENSOR_GPIO": settings.get("MOTION_SENSOR_GPIO") or current_app.config.get("MOTION_SENSOR_GPIO", "22"),
             "MOTION_SENSOR_ENABLED": settings.get("MOTION_SENSOR_ENABLED") or current_app.config.get("MOTION_SENSOR_ENABLED", "0"),
             "MOTION_FRAMEDIFF_ENABLED": settings.get("MOTION_FRAMEDIFF_ENABLED") or current_app.config.get("MOTION_FRAMEDIFF_ENABLED", "1"),
+            "VIDEO_ENCODER": settings.get("VIDEO_ENCODER") or current_app.config.get("VIDEO_ENCODER", "copy"),
+            "VERIFY_WITH_FFPROBE": current_app.config.get("VERIFY_WITH_FFPROBE", "0"),
             "FFMPEG_BIN": current_app.config.get("FFMPEG_BIN", "ffmpeg"),
             "PREFIX": settings.get("PREFIX") or current_app.config.get("PREFIX", "nest_"),
         }
+        if config == self.config:
+            return False
+        self.config = config
+        return True
+
+    def reload_config(self) -> None:
+        """Have the detection loop reload its settings before the next frame."""
+        self._config_dirty.set()
+
+    def notify_settings_changed(self) -> None:
+        """Tell running motion detection that its settings changed.
+
+        Covers a detection loop in this process as well as the motion
+        service process, which reloads on SIGHUP (see scripts/run-motion.py).
+        """
+        self.reload_config()
+
+        from .systemd_utils import units_properties
+
+        props = units_properties((MOTION_UNIT,), "MainPID").get(MOTION_UNIT, {})
+        try:
+            pid = int(props.get("MainPID") or 0)
+        except (TypeError, ValueError):
+            pid = 0
+        if pid and pid != os.getpid():
+            try:
+                os.kill(pid, signal.SIGHUP)
+            except OSError as e:
+                logger.warning(f"Could not signal {MOTION_UNIT} (pid {pid}): {e}")
+
     def start(self) -> dict:
         """Start the motion detection service."""
         if self.running:
             return {"ok": True, "status": "running", "info": "Motion detection already running"}
 
         enabled = current_app.config.get("MOTION_ENABLED", "1")
-        if enabled not in ("1", "true", "True", "yes", "Yes"):
+        if not _truthy(enabled):
             return {"ok": False, "error": "Motion detection disabled in settings"}
 
         # Store app reference and config for background thread
         self.app = current_app._get_current_object()
         self._load_config()
+        # Resolved once; snapshots are written from the detection thread
+        self._motion_dir = Path(self.app.config.get("MEDIA_ROOT", "data")) / "motion"
+        self._motion_dir.mkdir(parents=True, exist_ok=True)
 
         # Validate that at least one detection method is enabled
         framediff_enabled = self.config.get("MOTION_FRAMEDIFF_ENABLED", "1")
         sensor_enabled = self.config.get("MOTION_SENSOR_ENABLED", "0")
 
-        framediff_on = framediff_enabled in ("1", "true", "True", "yes", "Yes")
-        sensor_on = sensor_enabled in ("1", "true", "True", "yes", "Yes")
+        framediff_on = _truthy(framediff_enabled)
+        sensor_on = _truthy(sensor_enabled)
 
         if not framediff_on and not sensor_on:
             return {"ok": False, "error": "At least one detection method (Frame-Diff or GPIO) must be enabled"}
@@ -99,6 +302,9 @@ class MotionDetectionService:
 
         # Start frame-diff detection thread if enabled
         if framediff_on:
+            if self._snapshot_thread is None or not self._snapshot_thread.is_alive():
+                self._snapshot_thread = Thread(target=self._snapshot_writer, daemon=True, name="MotionSnapshots")
+                self._snapshot_thread.start()
             thread = Thread(target=self._detection_loop, daemon=True)
             thread.start()
             logger.info("Motion detection (frame-diff) started")
@@ -136,6 +342,8 @@ class MotionDetectionService:
 
         self.running = False
         self.stop_event.set()
+        # Unblocks a detection loop waiting on the stream
+        self._stop_sampler()
 
         # Update database setting to persist service state
         if self.app:
@@ -154,29 +362,33 @@ class MotionDetectionService:
 
     def status(self) -> dict:
         """Get current status."""
-        framediff_enabled = self.config.get("MOTION_FRAMEDIFF_ENABLED", "1") in ("1", "true", "True", "yes", "Yes") if self.config else False
-        gpio_enabled = self.config.get("MOTION_SENSOR_ENABLED", "0") in ("1", "true", "True", "yes", "Yes") if self.config else False
+        framediff_enabled = bool(self.config) and _truthy(self.config.get("MOTION_FRAMEDIFF_ENABLED", "1"))
+        gpio_enabled = bool(self.config) and _truthy(self.config.get("MOTION_SENSOR_ENABLED", "0"))
 
         return {
             "running": self.running,
-            "recording": self.recording_lock,
+            "recording": self.recording_guard.locked(),
             "last_motion": self.last_motion_time,
             "gpio_enabled": gpio_enabled,
             "framediff_enabled": framediff_enabled,
             "gpio_available": self.gpio_available
         }
 
-    def _trigger_recording(self, source: str = "unknown", frame=None):
+    def _trigger_recording(self, source: str = "unknown", snapshot: bool = False):
         """Central method to trigger recording from any source.
 
         This ensures only one recording runs at a time, regardless of trigger source.
+
+        Args:
+            source: Trigger name for the log
+            snapshot: Also save a full-resolution still of the stream
         """
         current_time = time.time()
         cooldown = int(self.config.get("MOTION_COOLDOWN_S", 5))
 
         # Check cooldown
         if current_time - self.last_motion_time <= cooldown:
-            logger.debug(f"Motion trigger from {source} ignored (cooldown active)")
+            logger.debug("Motion trigger from %s ignored (cooldown active)", source)
             return
 
         # Try to acquire recording guard (non-blocking)
@@ -184,64 +396,129 @@ class MotionDetectionService:
             logger.info(f"Motion triggered by {source}")
             self.last_motion_time = current_time
 
-            # Save motion snapshot if frame is provided
-            if frame is not None:
-                self._save_motion_snapshot(frame)
-
-            #self.recording_lock = True
+            # Save motion snapshot if requested
+            if snapshot:
+                self._save_motion_snapshot()
 
             # Start recording in background thread
             record_thread = Thread(target=self._record_video, daemon=True)
             record_thread.start()
         else:
-            logger.debug(f"Motion trigger from {source} ignored (recording already in progress)")
-
-    def _save_motion_snapshot(self, frame):
-        """Save the current frame as JPG in the motion directory."""
-        try:
-            with self.app.app_context():
-                media_root = Path(current_app.config.get("MEDIA_ROOT", "data"))
-                motion_dir = media_root / "motion"
-                motion_dir.mkdir(parents=True, exist_ok=True)
-
-                # Generate filename with timestamp
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                prefix = current_app.config.get("PREFIX", "nest_")
-                filename = f"{prefix}motion_{timestamp}.jpg"
-                output_path = motion_dir / filename
-
-                # Save frame as JPG
-                cv2.imwrite(str(output_path), frame, [cv2.IMWRITE_JPEG_QUALITY, 90])
+            logger.debug("Motion trigger from %s ignored (recording already in progress)", source)
 
-                logger.info(f"Motion snapshot saved: {filename}")
-
-        except Exception as e:
-            logger.exception("Error saving motion snapshot")
+    def _save_motion_snapshot(self):
+        """Queue a full-resolution still of the stream as JPG in the motion directory."""
+        # Generate filename with timestamp
+        filename = f"{self.config.get('PREFIX', 'nest_')}motion_{datetime.now():%Y%m%d_%H%M%S}.jpg"
+        self._queue_snapshot(None, self._motion_dir / filename)
 
     def _save_debug_snapshot(self, frame, gray, thresh):
         """Save debug frames to analyze motion detection (temporary for testing)."""
-        try:
-            with self.app.app_context():
-                media_root = Path(current_app.config.get("MEDIA_ROOT", "data"))
-                motion_dir = media_root / "motion"
-                motion_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = f"{datetime.now():%Y%m%d_%H%M%S}"
+        prefix = self.config.get("PREFIX", "nest_")
 
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                prefix = current_app.config.get("PREFIX", "nest_")
+        # Save original frame
+        self._queue_snapshot(frame, self._motion_dir / f"{prefix}debug_{timestamp}_sample.jpg")
 
-                # Save original frame
-                cv2.imwrite(str(motion_dir / f"{prefix}debug_{timestamp}_original.jpg"), frame, [cv2.IMWRITE_JPEG_QUALITY, 90])
+    def _queue_snapshot(self, frame, path: Path):
+        """Hand a frame to the snapshot writer without blocking detection.
 
-                logger.info(f"Debug snapshots saved: {timestamp}")
+        With frame=None the writer grabs a full-resolution frame from the
+        stream instead. If the writer falls behind, the oldest pending
+        snapshot is dropped.
+        """
+        try:
+            self._snapshots.put_nowait((frame, path))
+        except queue.Full:
+            try:
+                self._snapshots.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self._snapshots.put_nowait((frame, path))
+            except queue.Full:
+                logger.warning(f"Snapshot queue full, dropped {path.name}")
 
-        except Exception as e:
-            logger.exception("Error saving debug snapshot")
+    def _snapshot_writer(self):
+        """Encode and write queued snapshots until the service stops."""
+        import cv2
+
+        while True:
+            try:
+                frame, path = self._snapshots.get(timeout=1)
+            except queue.Empty:
+                if self.stop_event.is_set():
+                    return
+                continue
+            try:
+                if frame is None:
+                    self._grab_still(path)
+                else:
+                    cv2.imwrite(str(path), frame, [cv2.IMWRITE_JPEG_QUALITY, SNAPSHOT_JPEG_QUALITY])
+                logger.info(f"Snapshot saved: {path.name}")
+            except Exception:
+                logger.exception("Error saving snapshot")
+
+    def _grab_still(self, path: Path):
+        """Write one full-resolution frame of the UDP stream to path as JPG."""
+        udp_url = self.config.get("STREAM_UDP_URL") or self.config.get("MOTION_SOURCE")
+        cmd = [
+            self.config.get("FFMPEG_BIN", "ffmpeg"),
+            "-hide_banner",
+            "-loglevel", "error",
+            "-i", udp_url,
+            "-frames:v", "1",
+            "-q:v", "3",
+            "-y", str(path),
+        ]
+        result = subprocess.run(cmd, stdin=subprocess.DEVNULL, capture_output=True, timeout=10)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.decode(errors="replace").strip()[:200] or "ffmpeg failed")
+
+    def _start_sampler(self, udp_url: str) -> subprocess.Popen:
+        """Start ffmpeg decoding the UDP stream into small gray frames on stdout.
+
+        Scaling, gray conversion and frame dropping (MOTION_FPS) happen in
+        the decoder, so Python only sees MOTION_SAMPLE_SIZE bytes per frame.
+        """
+        width, height = MOTION_SAMPLE_SIZE
+        cmd = [
+            self.config.get("FFMPEG_BIN", "ffmpeg"),
+            "-hide_banner",
+            "-loglevel", "error",
+            "-fflags", "nobuffer",
+            "-flags", "low_delay",
+            "-i", udp_url,
+            "-vf", f"fps={MOTION_FPS},scale={width}:{height}:flags=area,format=gray",
+            "-f", "rawvideo",
+            "pipe:1",
+        ]
+        self._sampler = subprocess.Popen(
+            cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=0
+        )
+        return self._sampler
+
+    def _stop_sampler(self):
+        proc, self._sampler = self._sampler, None
+        if proc is None or proc.poll() is not None:
+            return
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
 
     def _detection_loop(self):
         """Main motion detection loop using simple frame difference.
 
-        Reads frames from UDP stream instead of direct camera access.
+        Reads frames from UDP stream instead of direct camera access. ffmpeg
+        delivers them already downsampled and gray at MOTION_FPS, and the
+        blocking read paces the loop.
         """
+        # Imported lazily: OpenCV is slow to load and only needed by this worker thread.
+        import cv2
+        import numpy as np
+
         try:
             # Use UDP stream as motion source (shared with HLS, WebRTC, timelapse)
             udp_url = self.config.get("STREAM_UDP_URL") or self.config.get("MOTION_SOURCE")
@@ -250,132 +527,101 @@ class MotionDetectionService:
                 self.running = False
                 return
 
-            # Wait for UDP stream to be available (stream service starts it)
-            logger.info("Waiting for UDP stream to become available...")
-            max_retries = 30  # 30 seconds
-            for i in range(max_retries):
-                cap = cv2.VideoCapture(udp_url, cv2.CAP_FFMPEG)
-                if cap.isOpened():
-                    break
-                cap.release()
-                if i < max_retries - 1:
-                    time.sleep(1)
-
-            if not cap.isOpened():
-                logger.error(f"Failed to open UDP stream: {udp_url} (timeout after {max_retries}s)")
-                self.running = False
-                return
-
-            # Set buffer size to reduce latency
-            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+            # ffmpeg waits for the UDP stream itself (stream service starts it)
+            proc = self._start_sampler(udp_url)
 
             # Get motion detection parameters from stored config
             threshold = int(self.config.get("MOTION_THRESHOLD", 25))
             cooldown = int(self.config.get("MOTION_COOLDOWN_S", 5))
 
-            logger.info(f"Motion detection running on UDP stream {udp_url} (threshold={threshold}, checking 2-3 fps)")
+            logger.info(f"Motion detection running on UDP stream {udp_url} (threshold={threshold}, checking {MOTION_FPS} fps)")
+
+            # Two frame buffers, swapped each frame: one is read into while
+            # the other holds the previous frame
+            width, height = MOTION_SAMPLE_SIZE
+            buffers = [bytearray(width * height), bytearray(width * height)]
+            frames = [np.frombuffer(b, dtype=np.uint8).reshape(height, width) for b in buffers]
+            have_prev = False
 
-            prev_frame = None
-            last_config_reload = time.time()
             consecutive_failures = 0
             max_failures = 10
 
             while self.running and not self.stop_event.is_set():
-                # Reload config from database every 5 minutes
+                # Reload config from database once settings were saved
                 current_time = time.time()
-                if current_time - last_config_reload >= 300:  # 300 seconds = 5 minutes
+                if self._config_dirty.is_set():
+                    self._config_dirty.clear()
                     with self.app.app_context():
-                        self._load_config()
-                        threshold = int(self.config.get("MOTION_THRESHOLD", 25))
-                        cooldown = int(self.config.get("MOTION_COOLDOWN_S", 5))
-                        logger.info(f"Reloaded motion detection config from database (threshold={threshold})")
-                        last_config_reload = current_time
-
-                ret, frame = cap.read()
-                if not ret:
+                        if self._load_config():
+                            threshold = int(self.config.get("MOTION_THRESHOLD", 25))
+                            cooldown = int(self.config.get("MOTION_COOLDOWN_S", 5))
+                            logger.info(f"Reloaded motion detection config from database (threshold={threshold})")
+
+                view = memoryview(buffers[0])
+                filled = 0
+                while filled < len(view):
+                    n = proc.stdout.readinto(view[filled:])
+                    if not n:
+                        break
+                    filled += n
+
+                if filled < len(view):
+                    if self.stop_event.is_set():
+                        break
                     consecutive_failures += 1
                     logger.warning(f"Failed to read frame from UDP stream (failure {consecutive_failures}/{max_failures})")
+                    self._stop_sampler()
 
                     if consecutive_failures >= max_failures:
-                        logger.error("Too many consecutive failures, attempting to reconnect to UDP stream...")
-                        cap.release()
-                        time.sleep(2)
-
-                        # Try to reconnect
-                        cap = cv2.VideoCapture(udp_url, cv2.CAP_FFMPEG)
-                        if not cap.isOpened():
-                            logger.error("Failed to reconnect to UDP stream, stopping motion detection")
-                            self.running = False
-                            break
-
-                        consecutive_failures = 0
-                        logger.info("Successfully reconnected to UDP stream")
+                        logger.error("Too many consecutive failures, stopping motion detection")
+                        self.running = False
+                        break
 
+                    # Reconnect
                     time.sleep(1)
+                    proc = self._start_sampler(udp_url)
+                    have_prev = False
                     continue
 
                 # Reset failure counter on successful read
                 consecutive_failures = 0
-
-                # Convert to grayscale and apply light blur to reduce noise
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                gray = cv2.GaussianBlur(gray, (5, 5), 0)  # Lighter blur for better motion detection
+                gray, prev_frame = frames
 
                 # Initialize previous frame
-                if prev_frame is None:
-                    prev_frame = gray
-                    time.sleep(0.4)  # ~2.5 fps
+                if not have_prev:
+                    have_prev = True
+                    buffers.reverse()
+                    frames.reverse()
                     continue
 
                 # Calculate frame difference
                 frame_delta = cv2.absdiff(prev_frame, gray)
                 thresh = cv2.threshold(frame_delta, threshold, 255, cv2.THRESH_BINARY)[1]
 
-                # Dilate to fill gaps in motion regions
-                thresh = cv2.dilate(thresh, None, iterations=2)
-
-                # Find contours to detect actual motion objects
-                contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-                for cont in contours:
-                    cont_diff = cv2.contourArea(cont)
-                    if cont_diff > 35:
-                        logger.info(f"${cv2.contourArea(cont)}")
-                        self._trigger_recording(
-                            source=f"frame-diff ({cont_diff}",
-                            frame=frame
-                        )
-                # Filter contours by minimum area (ignore tiny movements)
-                #min_area = (total_pixels if 'total_pixels' in locals() else frame.shape[0] * frame.shape[1]) * 0.001  # 0.1% of frame
-                #significant_contours = [c for c in contours if cv2.contourArea(c) > min_area]
-
-                # Calculate motion score based on significant contours
-                #motion_pixels = sum(cv2.contourArea(c) for c in significant_contours)
-                #total_pixels = thresh.shape[0] * thresh.shape[1]
-                #motion_percent = (motion_pixels / total_pixels) * 100
-
-                # Check if motion detected - require measurable change (> 0.5% significant movement)
-                #logger.info(f"Motion check: pixels={motion_pixels:.2f}, percent={motion_percent:.2f}%, contours={len(significant_contours)}, threshold={threshold}")
+                # Count changed pixels (ignore tiny movements)
+                moved = cv2.countNonZero(thresh)
+                if moved >= MOTION_MIN_PIXELS:
+                    self._trigger_recording(
+                        source=f"frame-diff ({moved}px)",
+                        snapshot=True
+                    )
 
                 # DEBUG: Save test frame every 10 seconds to verify detection is working
                 if not hasattr(self, '_last_debug_save'):
                     self._last_debug_save = 0
                 if current_time - self._last_debug_save >= 10:
-                    self._save_debug_snapshot(frame, gray, thresh)
+                    self._save_debug_snapshot(gray.copy(), gray, thresh)
                     self._last_debug_save = current_time
 
-                #if motion_pixels > 200 and len(significant_contours) > 0:
-
-
                 # Update previous frame
-                prev_frame = gray
-
-                # Check 2-3 times per second (0.33-0.4s delay)
-                time.sleep(0.4)
+                buffers.reverse()
+                frames.reverse()
 
-            cap.release()
+            self._stop_sampler()
 
         except Exception as e:
             logger.exception("Error in motion detection loop")
+            self._stop_sampler()
             self.running = False
 
     def _gpio_sensor_loop(self):
@@ -396,19 +642,21 @@ class MotionDetectionService:
             GPIO.setmode(GPIO.BCM)
             GPIO.setup(gpio_pin, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
 
+            # Rising edges arrive via a kernel interrupt on RPi.GPIO's own
+            # thread; bouncetime (ms) debounces the sensor
+            GPIO.add_event_detect(
+                gpio_pin,
+                GPIO.RISING,
+                callback=lambda channel: self._trigger_recording(source="gpio-sensor"),
+                bouncetime=500,
+            )
+
             logger.info(f"GPIO motion sensor monitoring on pin {gpio_pin}")
 
-            while self.running and not self.stop_event.is_set():
-                # Check sensor state
-                if GPIO.input(gpio_pin):
-                    self._trigger_recording(source="gpio-sensor")
-                    # Wait a bit to debounce
-                    time.sleep(0.5)
-                else:
-                    # Check sensor 2-3 times per second
-                    time.sleep(0.4)
+            self.stop_event.wait()
 
             # Cleanup GPIO
+            GPIO.remove_event_detect(gpio_pin)
             GPIO.cleanup(gpio_pin)
             logger.info("GPIO motion sensor monitoring stopped")
 
@@ -417,17 +665,11 @@ class MotionDetectionService:
             self.gpio_available = False
 
     def _record_video(self):
-        """Record a video clip when motion is detected."""
-        if self.recording_lock:
-            logger.debug("Recording already in progress, skipping")
-            return
-
-        if self.recording_lock:
-            logger.debug("Recording already in progress, skipping")
-            return
-
-        self.recording_lock = True
+        """Record a video clip when motion is detected.
 
+        Runs with recording_guard held (acquired by _trigger_recording) and
+        releases it when done.
+        """
         try:
             # Get configuration from stored config
             duration = int(self.config.get("MOTION_DURATION_S", 10))
@@ -454,101 +696,41 @@ class MotionDetectionService:
 
             logger.info(f"Recording motion video: {filename} ({duration}s @ {resolution} {fps}fps)")
 
-            # Build ffmpeg command
-            #cmd = [
-            #    self.config.get("FFMPEG_BIN", "ffmpeg"),
-            #    "-hide_banner",
-            #    "-loglevel", "error",
-            #]
-
-            # Add video source
-            #if video_source.startswith("-"):
-            #    cmd.extend(video_source.split())
-            #else:
-            #    cmd.extend(["-i", video_source])
-
-            # Add audio source if available
-            #if audio_source:
-            #    if audio_source.startswith("-"):
-            #        cmd.extend(audio_source.split())
-            #    else:
-            #        cmd.extend(["-i", audio_source])
-
-            # Output options
-            width, height = resolution.split('×')
-            #cmd.extend([
-            #    "-t", str(duration),  # Duration
-            #])
-
-            # Apply video filters (scale + rotation)
-            rotation = self.config.get("VIDEO_ROTATION", "0")
-            rotation_filter = get_rotation_filter(rotation)
-            scale_filter = f"scale={width}:{height}"
-            filter_args = apply_video_filters(scale_filter, rotation_filter)
-            #cmd.extend(filter_args)
-
-            #cmd.extend([
-            #    "-r", str(fps),
-            #    "-c:v", "libx264",
-            #    "-preset", "fast",
-            #    "-crf", "23",
-            #    "-pix_fmt", "yuv420p",
-            #])
-
-            # Audio encoding (if audio source present)
-            #if audio_source:
-            #    cmd.extend([
-            #        "-c:a", "aac",
-            #        "-b:a", "128k",
-            #    ])
-
-            #cmd.extend([
-            #    "-y",  # Overwrite if exists
-            #    str(output_path)
-            #])
-            # Build ffmpeg command with robust UDP options
-            cmd = [
-                "ffmpeg",
-                "-hide_banner",
-                "-loglevel", "error",
-                "-fflags", "+genpts+discardcorrupt+igndts",
-                "-flags", "low_delay",
-                "-strict", "experimental",
-                "-analyzeduration", "5000000",
-                "-probesize", "10000000",
-                "-i", video_source,
-                "-t", str(duration),
-                "-c:v", "copy",
-            ]
-
-            # Add audio handling based on configuration
-            if audio_source and audio_source.strip():
+            encoder = self.config.get("VIDEO_ENCODER") or "copy"
+            if encoder not in _ENCODER_ARGS:
+                logger.warning(f"Unknown VIDEO_ENCODER {encoder!r}, copying the stream instead")
+                encoder = "copy"
+
+            input_args: list[str] = []
+            video_args = _ENCODER_ARGS[encoder]
+            if encoder != "copy":
+                # Re-encoding: scale + rotation filters and the output rate apply
+                if encoder == "h264_nvenc":
+                    # Decode on the GPU too; CUDA frames can't go through the software scale filter
+                    input_args = ["-hwaccel", "cuda", "-hwaccel_output_format", "cuda"]
+                    filter_args = []
+                else:
+                    width, height = resolution.replace("×", "x").split("x")
+                    rotation_filter = get_rotation_filter(self.config.get("VIDEO_ROTATION", "0"))
+                    filter_args = apply_video_filters(f"scale={width}:{height}", rotation_filter)
+                video_args = [*filter_args, "-r", str(fps), *video_args]
+
+            has_audio = bool(audio_source and audio_source.strip())
+            if has_audio:
                 # Audio is configured - try to copy it
                 logger.info(f"Audio source configured: {audio_source}")
-                cmd.extend(["-c:a", "copy"])
             else:
                 # No audio configured - disable audio track
                 logger.info("No audio source configured, disabling audio")
-                cmd.extend(["-an"])
 
-            # Add output options
-            cmd.extend([
-                "-movflags", "+faststart",
-                "-avoid_negative_ts", "make_zero",
-                "-y", str(output_path)
-            ])
-
-            # Wait briefly to ensure UDP stream has sent at least one keyframe
-            # This helps ffmpeg properly detect stream parameters
-            #logger.info("Waiting 2 seconds for UDP stream to stabilize...")
-            #time.sleep(2)
+            cmd = _build_record_cmd(video_source, output_path, duration, has_audio, video_args, input_args)
 
             # Execute recording
             logger.info(f"Starting recording with command: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=duration + 15)
+            returncode, stderr_tail = _run_ffmpeg(cmd, timeout_s=duration + 15)
 
-            if result.returncode != 0:
-                logger.error(f"ffmpeg failed: {result.stderr}")
+            if returncode != 0:
+                logger.error(f"ffmpeg failed: {stderr_tail}")
                 return
 
             # Verify file was created
@@ -560,34 +742,12 @@ class MotionDetectionService:
             stat = output_path.stat()
             relative_path = str(output_path.relative_to(media_root))
 
-            # Get video duration and resolution using ffprobe
-            try:
-                probe_cmd = [
-                    "ffprobe",
-                    "-v", "error",
-                    "-show_entries", "format=duration:stream=width,height",
-                    "-of", "default=noprint_wrappers=1",
-                    str(output_path)
-                ]
-                probe_result = subprocess.run(probe_cmd, capture_output=True, text=True, timeout=5)
-
-                actual_duration = None
-                actual_width = None
-                actual_height = None
-
-                for line in probe_result.stdout.strip().split('\n'):
-                    if line.startswith("duration="):
-                        actual_duration = int(float(line.split('=')[1]))
-                    elif line.startswith("width="):
-                        actual_width = int(line.split('=')[1])
-                    elif line.startswith("height="):
-                        actual_height = int(line.split('=')[1])
-
-                actual_resolution = f"{actual_width}x{actual_height}" if actual_width and actual_height else resolution
-
-            except Exception:
-                actual_duration = duration
-                actual_resolution = resolution
+            # -t and the configured resolution describe the clip; probing the
+            # file is opt-in (copy mode can cut at a keyframe boundary)
+            actual_duration = duration
+            actual_resolution = resolution
+            if _truthy(self.config.get("VERIFY_WITH_FFPROBE", "0")):
+                actual_duration, actual_resolution = _probe_video(output_path, duration, resolution)
 
             # Save to database (need app context)
             with self.app.app_context():
@@ -610,9 +770,7 @@ class MotionDetectionService:
         except Exception as e:
             logger.exception("Error recording video")
         finally:
-            self.recording_lock = False
-            if self.recording_guard.locked():
-                self.recording_guard.release()
+            self.recording_guard.release()
 
 
 # Singleton instance
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import threading
 import time
 
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -9,6 +10,7 @@ from .logging_service import log_metric
 
 
 scheduler = BackgroundScheduler(daemon=True)
+_init_lock = threading.Lock()
 
 
 def init_scheduler(app) -> None:
@@ -21,15 +23,18 @@ def init_scheduler(app) -> None:
     For production on Pi, you may prefer systemd timers instead.
     """
 
-    if scheduler.running:
-        return
+    # create_app() initializes the scheduler from a background thread, so
+    # callers like jobs_worker.py may race with it.
+    with _init_lock:
+        if scheduler.running:
+            return
 
-    def photo_capture_job():
-        t0 = time.time()
-        # placeholder - no-op
-        log_metric(app.logger, "job_photo", status="noop", duration_ms=int((time.time() - t0) * 1000))
+        def photo_capture_job():
+            t0 = time.time()
+            # placeholder - no-op
+            log_metric(app.logger, "job_photo", status="noop", duration_ms=int((time.time() - t0) * 1000))
 
-    scheduler.add_job(photo_capture_job, "interval", seconds=300, id="photo_capture", replace_existing=True)
+        scheduler.add_job(photo_capture_job, "interval", seconds=300, id="photo_capture", replace_existing=True)
 
-    scheduler.start()
-    app.logger.info("APScheduler started with %d job(s)", len(scheduler.get_jobs()))
+        scheduler.start()
+        app.logger.info("APScheduler started with %d job(s)", len(scheduler.get_jobs()))
@@ -26,6 +26,17 @@ class StreamStatus:
     pid: int | None
     started_at: float | None
 
+    def to_dict(self) -> dict:
+        """JSON-safe representation used by the API."""
+        from datetime import datetime
+
+        return {
+            "running": self.running,
+            "mode": self.mode,
+            "pid": int(self.pid or 0),
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat() if self.started_at else "",
+        }
+
 
 class StreamService:
     """Single-pipeline streaming manager."""
@@ -331,6 +342,11 @@ class StreamService:
                             os.killpg(self._proc.pid, signal.SIGKILL)
                         except Exception:
                             self._proc.kill()
+                        # Reap it, so callers can restart as soon as stop() returns
+                        try:
+                            self._proc.wait(timeout=2)
+                        except subprocess.TimeoutExpired:
+                            pass
 
                 self._proc = None
                 self._started_at = None
@@ -0,0 +1,194 @@
+"""Helpers to query systemd unit state.
+
+Properties are read in-process over D-Bus (org.freedesktop.systemd1) when the
+optional ``pystemd`` package is installed, otherwise via ``systemctl show``.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import subprocess
+from datetime import datetime
+
+try:
+    import orjson
+except ImportError:  # optional, see requirements.txt
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# journalctl --output=json emits one object per line; orjson parses them
+# several times faster. Both decode errors are ValueError subclasses.
+_json_loads = json.loads if orjson is None else orjson.loads
+
+# Timer units shipped in scripts/systemd
+BIRDSHOME_TIMERS = (
+    "birdshome-detect.timer",
+    "birdshome-network.timer",
+    "birdshome-snapshot.timer",
+    "birdshome-timelapse.timer",
+    "birdshome-upload.timer",
+)
+
+# D-Bus interfaces a property may live on, in lookup order
+_INTERFACES = ("Unit", "Timer", "Service")
+
+
+def unit_properties(unit: str, *props: str) -> dict[str, object]:
+    """Read properties of a systemd unit.
+
+    Args:
+        unit: Unit name, e.g. "birdshome-timelapse.timer"
+        props: Property names, e.g. "ActiveState", "NextElapseUSecRealtime"
+
+    Returns:
+        dict of the properties that could be read. Values are str, or int for
+        numeric properties read over D-Bus.
+    """
+    return units_properties((unit,), *props).get(unit, {})
+
+
+def units_properties(units, *props: str) -> dict[str, dict[str, object]]:
+    """Read the same properties of several units in one go.
+
+    Over D-Bus this is one in-process call per unit; the fallback is a single
+    ``systemctl show`` for all units instead of one process each.
+
+    Returns:
+        dict unit name -> properties (see unit_properties); units that could
+        not be read are missing.
+    """
+    try:
+        return {unit: _dbus_properties(unit, props) for unit in units}
+    except ImportError:
+        pass
+    except Exception as e:
+        logger.debug("D-Bus query for %s failed, using systemctl: %s", ", ".join(units), e)
+    return _systemctl_properties(units, props)
+
+
+def usec_to_timestamp(value) -> float | None:
+    """Convert a systemd usec timestamp (int or digit string) to Unix seconds."""
+    try:
+        usec = int(value)
+    except (TypeError, ValueError):
+        return None
+    if usec <= 0:
+        return None
+    return usec / 1_000_000
+
+
+def usec_to_datetime(value) -> datetime | None:
+    """Convert a systemd usec timestamp (int or digit string) to local time."""
+    ts = usec_to_timestamp(value)
+    return None if ts is None else datetime.fromtimestamp(ts)
+
+
+def _dbus_properties(unit: str, props) -> dict[str, object]:
+    from pystemd.systemd1 import Unit
+
+    values = {}
+    with Unit(unit.encode()) as sd_unit:
+        for prop in props:
+            for iface in _INTERFACES:
+                try:
+                    value = getattr(getattr(sd_unit, iface), prop)
+                except AttributeError:
+                    continue
+                values[prop] = value.decode() if isinstance(value, bytes) else value
+                break
+    return values
+
+
+def _systemctl_properties(units, props) -> dict[str, dict[str, object]]:
+    try:
+        result = subprocess.run(
+            ["systemctl", "show", *units, f"--property=Id,{','.join(props)}"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return {}
+    if result.returncode != 0:
+        return {}
+
+    # One block of KEY=value lines per unit, separated by blank lines
+    values = {}
+    for block in result.stdout.split("\n\n"):
+        unit_values = {}
+        for line in block.splitlines():
+            key, sep, value = line.partition("=")
+            if sep:
+                unit_values[key] = value.strip()
+        unit = unit_values.pop("Id", None)
+        if unit:
+            values[unit] = unit_values
+    return values
+
+
+def journal_entries(unit: str, lines: int, max_priority: int | None = None) -> list[dict]:
+    """Last ``lines`` journal entries of a unit, newest first.
+
+    Reads the journal in-process with the optional ``systemd`` Python binding
+    and falls back to ``journalctl --output=json``.
+
+    Returns:
+        list of dicts with "MESSAGE", "PRIORITY" (str) and
+        "__REALTIME_TIMESTAMP" (usec since epoch, str), as journalctl emits them.
+    """
+    try:
+        return _journal_reader_entries(unit, lines, max_priority)
+    except ImportError:
+        pass
+    except Exception as e:
+        logger.debug("Journal reader for %s failed, using journalctl: %s", unit, e)
+    return _journalctl_entries(unit, lines, max_priority)
+
+
+def _journal_reader_entries(unit: str, lines: int, max_priority: int | None) -> list[dict]:
+    from systemd import journal
+
+    entries = []
+    with journal.Reader() as reader:
+        reader.add_match(_SYSTEMD_UNIT=unit)
+        if max_priority is not None:
+            # Matches on the same field are OR'ed, like journalctl -p
+            for priority in range(max_priority + 1):
+                reader.add_match(PRIORITY=str(priority))
+        reader.seek_tail()
+        while len(entries) < lines:
+            entry = reader.get_previous()
+            if not entry:
+                break
+            realtime = entry.get("__REALTIME_TIMESTAMP")
+            entries.append({
+                "MESSAGE": str(entry.get("MESSAGE", "")),
+                "PRIORITY": str(entry.get("PRIORITY", 6)),
+                "__REALTIME_TIMESTAMP": str(int(realtime.timestamp() * 1_000_000)) if realtime else "0",
+            })
+    return entries
+
+
+def _journalctl_entries(unit: str, lines: int, max_priority: int | None) -> list[dict]:
+    cmd = ["journalctl", "-u", unit, "-n", str(lines), "--no-pager", "--output=json", "--reverse"]
+    if max_priority is not None:
+        cmd.extend(["-p", str(max_priority)])
+    try:
+        # Raw bytes, both parsers take them and handle the UTF-8 decoding
+        result = subprocess.run(cmd, capture_output=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return []
+    if result.returncode != 0:
+        return []
+
+    entries = []
+    for line in result.stdout.splitlines():
+        if not line:
+            continue
+        try:
+            entries.append(_json_loads(line))
+        except ValueError:
+            continue
+    return entries
@@ -102,7 +102,7 @@ class UploadService:
                 # Additional WebDAV settings for better compatibility
                 f.write("pacer_min_sleep = 10ms\n")
 
-            logger.debug(f"Created temporary rclone config for user: {user}")
+            logger.debug("Created temporary rclone config for user: %s", user)
             return config_path
         except Exception as e:
             logger.error(f"Failed to create rclone config: {e}")
@@ -161,11 +161,11 @@ class UploadService:
                 if result.returncode != 0:
                     # Check if error is "directory already exists" (which is okay)
                     if "already exists" in result.stderr.lower() or "409" in result.stderr:
-                        logger.debug(f"Directory already exists: {current_path}")
+                        logger.debug("Directory already exists: %s", current_path)
                         continue
                     # 405 Method Not Allowed can occur when directory exists in WebDAV
                     elif "405" in result.stderr:
-                        logger.debug(f"Directory might already exist (405): {current_path}")
+                        logger.debug("Directory might already exist (405): %s", current_path)
                         continue
                     # Check for 401 Unauthorized
                     elif "401" in result.stderr or "unauthorized" in result.stderr.lower():
@@ -176,7 +176,7 @@ class UploadService:
                         # Continue anyway, might be okay
                         continue
                 else:
-                    logger.debug(f"Created directory: {current_path}")
+                    logger.debug("Created directory: %s", current_path)
 
             logger.info(f"Successfully ensured remote directory exists: {remote_path}")
             return True
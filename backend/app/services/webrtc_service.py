@@ -7,6 +7,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import threading
 import uuid
 from typing import Dict, Optional
 import subprocess
@@ -26,8 +27,37 @@ class WebRTCService:
         self.peers: Dict[str, 'WebRTCPeer'] = {}
         self.pipeline_process: Optional[subprocess.Popen] = None
         self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
         self._config = {}
 
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the shared event loop thread on first use."""
+        with self._loop_lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                threading.Thread(target=self.loop.run_forever, daemon=True, name="webrtc-loop").start()
+            return self.loop
+
+    def run(self, coro, timeout: float = 30.0):
+        """Run a coroutine on the shared event loop and wait for its result.
+
+        Peer connections are bound to the loop they were created on, so all
+        requests must use the same long-lived loop. The coroutine runs inside
+        the caller's app context.
+        """
+        app = current_app._get_current_object()
+
+        async def _in_app_context():
+            with app.app_context():
+                return await coro
+
+        future = asyncio.run_coroutine_threadsafe(_in_app_context(), self._ensure_loop())
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
     def _load_config(self) -> None:
         """Load configuration from database settings."""
         from ..models import Setting
@@ -54,7 +54,7 @@ def main():
 
         # Keep running until interrupted
         try:
-            while day_night_service._running:
+            while day_night_service.is_monitoring:
                 time.sleep(1)
         except KeyboardInterrupt:
             pass
@@ -10,6 +10,10 @@ import signal
 import time
 from pathlib import Path
 
+# SIGHUP (settings saved) would terminate the process until main() installs
+# the reload handler, so ignore it while the app modules are imported.
+signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
 # Add backend directory to path
 backend_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_dir))
@@ -30,6 +34,8 @@ def main():
     # Register signal handlers
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
+    # Sent by the web app when settings are saved
+    signal.signal(signal.SIGHUP, lambda sig, frame: motion_service.reload_config())
 
     app = create_app()
 
@@ -89,7 +89,15 @@ export const api = {
       search: string;
     }>(`/api/admin/logs?${query.toString()}`);
   },
-  gallery: (filter: 'all' | 'birds' | 'nobirds') => request<any[]>(`/api/media/gallery?filter=${encodeURIComponent(filter)}`),
+  gallery: (filter: 'all' | 'birds' | 'nobirds', before?: { timestamp: string; id: string }) => {
+    const query = new URLSearchParams({ filter });
+    // Older page: timestamp and id of the last item already shown
+    if (before) {
+      query.append('before', before.timestamp);
+      query.append('before_id', before.id);
+    }
+    return request<any[]>(`/api/media/gallery?${query.toString()}`);
+  },
   deleteMedia: (id: string, type: string) => request<{ ok: boolean }>('/api/media/delete', {
     method: 'DELETE',
     body: JSON.stringify({ id, type }),